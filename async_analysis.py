@@ -0,0 +1,67 @@
+import asyncio, os
+from concurrent.futures import ThreadPoolExecutor
+
+from password_logic import analyze
+
+_DONE = object()
+
+class _ProducerError:
+    def __init__(self, error):
+        self.error = error
+
+async def analyze_stream(passwords, ordered=True, executor=None, max_workers=None, max_pending=None, analyzer=analyze):
+    # Yields (password, result) for each item of the async iterable. At most
+    # max_pending items are in flight or waiting to be consumed, so a fast
+    # producer is paused instead of queueing without bound. Pass a
+    # ProcessPoolExecutor to score on several cores.
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    workers = max_workers or getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+    slots = asyncio.Semaphore(max_pending or 2 * workers)
+    results = asyncio.Queue()
+    in_flight = set()
+
+    async def pump():
+        try:
+            async for password in passwords:
+                await slots.acquire()
+                future = loop.run_in_executor(executor, analyzer, password)
+                if ordered:
+                    results.put_nowait((password, future))
+                else:
+                    in_flight.add(future)
+                    future.add_done_callback(in_flight.discard)
+                    future.add_done_callback(lambda done, password=password: results.put_nowait((password, done)))
+        except Exception as error:
+            results.put_nowait(_ProducerError(error))
+            return
+        if in_flight:
+            await asyncio.wait(set(in_flight))
+        results.put_nowait(_DONE)
+
+    pump_task = loop.create_task(pump())
+    try:
+        while True:
+            item = await results.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _ProducerError):
+                raise item.error
+            password, future = item
+            try:
+                result = await future
+            finally:
+                slots.release()
+            yield password, result
+    finally:
+        pump_task.cancel()
+        for future in list(in_flight):
+            future.cancel()
+        while not results.empty():
+            item = results.get_nowait()
+            if isinstance(item, tuple):
+                item[1].cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,98 @@
+import json, math, threading
+from array import array
+from collections import OrderedDict
+
+from password_logic import STRENGTHS
+
+def load_row(line):
+    # Accounts may carry bytes that are not UTF-8, written back as read by bulk_audit.py
+    try:
+        return json.loads(line)
+    except UnicodeDecodeError:
+        return json.loads(line.decode('utf-8', 'surrogateescape'))
+
+class AuditResultFile:
+    # Index over a bulk_audit.py JSONL file. One scan keeps only compact
+    # per-row columns (offset, entropy, score, strength); full rows are read
+    # back from disk on demand, so memory does not depend on row contents.
+    ROW_CACHE_SIZE = 512
+
+    def __init__(self, path):
+        self.path = path
+        self.offsets = array('Q')
+        self.entropy = array('f')
+        self.scores = array('b')
+        self.strengths = array('b')
+        self._file = None
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def scan(self, progress=None, cancelled=None):
+        with open(self.path, 'rb') as f:
+            total = max(f.seek(0, 2), 1)
+            f.seek(0)
+            offset = 0
+            for line in f:
+                if line.strip():
+                    row = load_row(line)
+                    entropy = row.get('entropy')
+                    score = row.get('score')
+                    self.offsets.append(offset)
+                    self.entropy.append(math.nan if entropy is None else entropy)
+                    self.scores.append(-1 if score is None else score)
+                    self.strengths.append(STRENGTHS.index(row['strength']) if row.get('strength') in STRENGTHS else -1)
+                offset += len(line)
+                if len(self.offsets) % 10000 == 0:
+                    if cancelled is not None and cancelled():
+                        return False
+                    if progress is not None:
+                        progress(offset / total)
+        self._file = open(self.path, 'rb')
+        return True
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def row(self, index):
+        with self._lock:
+            row = self._rows.get(index)
+            if row is None:
+                self._file.seek(self.offsets[index])
+                row = load_row(self._file.readline())
+                self._rows[index] = row
+                if len(self._rows) > self.ROW_CACHE_SIZE:
+                    self._rows.popitem(last=False)
+            else:
+                self._rows.move_to_end(index)
+            return row
+
+    def query(self, strength=None, min_entropy=None, min_score=None, sort_key='line', descending=False):
+        # Row indices matching the filters, in display order; pure Python over
+        # the columns so it can run on a worker thread
+        entropy, scores, strengths = self.entropy, self.scores, self.strengths
+        indices = range(len(self))
+        if strength is not None:
+            wanted = STRENGTHS.index(strength)
+            indices = [i for i in indices if strengths[i] == wanted]
+        if min_entropy is not None:
+            indices = [i for i in indices if entropy[i] >= min_entropy]
+        if min_score is not None:
+            indices = [i for i in indices if scores[i] >= min_score]
+
+        if sort_key == 'entropy':
+            # Rows decided early have no entropy; keep them last either way
+            nan_rows = [i for i in indices if math.isnan(entropy[i])]
+            indices = sorted((i for i in indices if not math.isnan(entropy[i])),
+                             key=entropy.__getitem__, reverse=descending) + nan_rows
+        elif sort_key == 'score':
+            indices = sorted(indices, key=scores.__getitem__, reverse=descending)
+        elif sort_key == 'strength':
+            indices = sorted(indices, key=strengths.__getitem__, reverse=descending)
+        elif descending:
+            indices = reversed(indices)
+        return array('I', indices)
@@ -0,0 +1,287 @@
+import argparse, hashlib, json, math, os, struct, sys
+from array import array
+
+import password_logic
+from password_logic import STRENGTHS, feedback_messages
+
+# Fixed-size summary of a bulk audit: how often passwords are reused and what
+# the results look like overall, however many entries go in. Passwords are
+# only ever seen as keyed hashes, and sketches built with the same key (for
+# shards of an export audited in parallel, or separate runs) can be merged.
+#   - a count-min sketch estimates how many accounts use each password;
+#   - the most shared ones are tracked as top-k candidates;
+#   - a HyperLogLog estimates the number of distinct passwords;
+#   - plain histograms cover strength, score, entropy and feedback.
+
+SKETCH_MAGIC = b'PGSK'
+SKETCH_FORMAT = 1
+# magic, format, key id, width, depth, HyperLogLog precision, top-k size, JSON length
+HEADER = struct.Struct('<4sB8sIBBII')
+DIGEST = struct.Struct('<QQ')
+
+DEFAULT_WIDTH = 1 << 18
+DEFAULT_DEPTH = 4
+DEFAULT_PRECISION = 14
+DEFAULT_TOP = 100
+ENTROPY_BIN = 10
+ENTROPY_BINS = 13
+
+class CountMinSketch:
+    def __init__(self, width=DEFAULT_WIDTH, depth=DEFAULT_DEPTH, counts=None):
+        self.width = width
+        self.depth = depth
+        self.counts = counts if counts is not None else array('I', bytes(4 * width * depth))
+
+    def _cells(self, h1, h2):
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+
+    def add(self, h1, h2, amount=1):
+        counts = self.counts
+        estimate = None
+        for cell in self._cells(h1, h2):
+            counts[cell] += amount
+            if estimate is None or counts[cell] < estimate:
+                estimate = counts[cell]
+        return estimate
+
+    def estimate(self, h1, h2):
+        counts = self.counts
+        return min(counts[cell] for cell in self._cells(h1, h2))
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("count-min sketches have different dimensions")
+        counts = self.counts
+        for index, value in enumerate(other.counts):
+            if value:
+                counts[index] += value
+
+class HyperLogLog:
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = registers if registers is not None else bytearray(1 << precision)
+
+    def add(self, h):
+        bits = 64 - self.precision
+        index = h >> bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def merge(self, other):
+        if self.precision != other.precision:
+            raise ValueError("HyperLogLogs have different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+class AuditSketch:
+    def __init__(self, secret=None, width=DEFAULT_WIDTH, depth=DEFAULT_DEPTH, precision=DEFAULT_PRECISION,
+                 top=DEFAULT_TOP):
+        self.secret = secret if secret is not None else os.urandom(32)
+        self.key_id = hashlib.blake2b(self.secret, digest_size=8).digest()
+        self.reuse = CountMinSketch(width, depth)
+        self.distinct = HyperLogLog(precision)
+        self.top_size = top
+        self.top = {}
+        self._floor = 0
+
+        self.entries = 0
+        self.strengths = {}
+        self.scores = {}
+        self.entropy = [0] * ENTROPY_BINS
+        self.entropy_unknown = 0
+        self.failures = {}
+        self.decided_by = {}
+
+    def digest(self, password):
+        return hashlib.blake2b(password.encode('utf-8', 'surrogateescape'), key=self.secret[:64],
+                               digest_size=DIGEST.size).digest()
+
+    def add(self, password, result):
+        digest = self.digest(password)
+        h1, h2 = DIGEST.unpack(digest)
+        count = self.reuse.add(h1, h2)
+        self.distinct.add(h1)
+        strength = STRENGTHS[result.strength]
+        if count > 1:
+            self._offer(digest, count, strength)
+
+        self.entries += 1
+        _bump(self.strengths, strength)
+        _bump(self.scores, result.score)
+        if result.entropy is None:
+            self.entropy_unknown += 1
+        else:
+            self.entropy[min(int(result.entropy // ENTROPY_BIN), ENTROPY_BINS - 1)] += 1
+        for message in feedback_messages(result.feedback_codes & password_logic.FEEDBACK_FAILURES):
+            _bump(self.failures, message)
+        if result.decided_by is not None:
+            _bump(self.decided_by, result.decided_by)
+
+    def _offer(self, digest, count, strength):
+        # Space for top_size candidates; the lowest is evicted when a password
+        # is seen more often than it
+        top = self.top
+        if digest in top:
+            top[digest][0] = count
+            return
+        if len(top) >= self.top_size and count <= self._floor:
+            return
+        top[digest] = [count, strength]
+        if len(top) > self.top_size:
+            del top[min(top, key=lambda key: top[key][0])]
+            self._floor = min(entry[0] for entry in top.values())
+
+    def merge(self, other):
+        if other.key_id != self.key_id:
+            raise ValueError("sketches were built with different keys")
+        self.reuse.merge(other.reuse)
+        self.distinct.merge(other.distinct)
+
+        candidates = {digest: list(entry) for digest, entry in other.top.items()}
+        candidates.update((digest, list(entry)) for digest, entry in self.top.items())
+        for digest, entry in candidates.items():
+            entry[0] = self.reuse.estimate(*DIGEST.unpack(digest))
+        ranked = sorted(candidates.items(), key=lambda item: item[1][0], reverse=True)[:self.top_size]
+        self.top = {digest: [count, strength] for digest, (count, strength) in ranked}
+        self._floor = min((entry[0] for entry in self.top.values()), default=0)
+
+        self.entries += other.entries
+        for mine, theirs in ((self.strengths, other.strengths), (self.scores, other.scores),
+                             (self.failures, other.failures), (self.decided_by, other.decided_by)):
+            for key, value in theirs.items():
+                _bump(mine, key, value)
+        self.entropy = [a + b for a, b in zip(self.entropy, other.entropy)]
+        self.entropy_unknown += other.entropy_unknown
+        return self
+
+    def _stats(self):
+        return {
+            'entries': self.entries,
+            'strengths': self.strengths,
+            'scores': {str(key): value for key, value in self.scores.items()},
+            'entropy': self.entropy,
+            'entropy_unknown': self.entropy_unknown,
+            'failures': self.failures,
+            'decided_by': self.decided_by,
+            'top': [[digest.hex(), count, strength] for digest, (count, strength) in self.top.items()],
+        }
+
+    def save(self, path):
+        stats = json.dumps(self._stats(), ensure_ascii=False).encode('utf-8')
+        with open(path + '.tmp', 'wb') as f:
+            f.write(HEADER.pack(SKETCH_MAGIC, SKETCH_FORMAT, self.key_id, self.reuse.width, self.reuse.depth,
+                                self.distinct.precision, self.top_size, len(stats)))
+            f.write(stats)
+            f.write(self.reuse.counts.tobytes())
+            f.write(self.distinct.registers)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path, secret=None):
+        # Without the secret the sketch can still be merged and reported, but not added to
+        with open(path, 'rb') as f:
+            magic, version, key_id, width, depth, precision, top, stats_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != SKETCH_MAGIC or version != SKETCH_FORMAT:
+                raise ValueError(f"{path} is not an audit sketch")
+            stats = json.loads(f.read(stats_size))
+            counts = array('I')
+            counts.frombytes(f.read(4 * width * depth))
+            registers = bytearray(f.read(1 << precision))
+
+        sketch = cls(secret, width=1, depth=1, precision=4, top=top)
+        if secret is None:
+            sketch.secret = None
+        elif sketch.key_id != key_id:
+            raise ValueError(f"{path} was built with a different key")
+        sketch.key_id = key_id
+        sketch.reuse = CountMinSketch(width, depth, counts)
+        sketch.distinct = HyperLogLog(precision, registers)
+        sketch.entries = stats['entries']
+        sketch.strengths = stats['strengths']
+        sketch.scores = {None if key == 'None' else int(key): value for key, value in stats['scores'].items()}
+        sketch.entropy = stats['entropy']
+        sketch.entropy_unknown = stats['entropy_unknown']
+        sketch.failures = stats['failures']
+        sketch.decided_by = stats['decided_by']
+        sketch.top = {bytes.fromhex(digest): [count, strength] for digest, count, strength in stats['top']}
+        sketch._floor = min((entry[0] for entry in sketch.top.values()), default=0) if len(sketch.top) >= top else 0
+        return sketch
+
+    def report(self):
+        distinct = min(self.distinct.count(), self.entries)
+        bins = [f"{i * ENTROPY_BIN}-{(i + 1) * ENTROPY_BIN - 1}" for i in range(ENTROPY_BINS - 1)]
+        bins.append(f"{(ENTROPY_BINS - 1) * ENTROPY_BIN}+")
+        return {
+            'entries': self.entries,
+            'distinct_passwords': distinct,
+            # Every account after the first on each password; the number of
+            # accounts on shared passwords cannot be recovered once merged
+            'duplicate_accounts': self.entries - distinct,
+            'most_shared': [
+                {'id': digest.hex()[:16], 'accounts': count, 'strength': strength}
+                for digest, (count, strength) in sorted(self.top.items(), key=lambda item: item[1][0], reverse=True)
+            ],
+            'strength': self.strengths,
+            'score': {str(key): value for key, value in sorted(self.scores.items(), key=lambda item: (item[0] is None, item[0] or 0))},
+            'entropy_bits': dict(zip(bins, self.entropy), **({'not computed': self.entropy_unknown} if self.entropy_unknown else {})),
+            'failures': dict(sorted(self.failures.items(), key=lambda item: item[1], reverse=True)),
+            'decided_by': self.decided_by,
+            'sketch_bytes': len(self.reuse.counts) * self.reuse.counts.itemsize + len(self.distinct.registers),
+        }
+
+def _bump(counts, key, amount=1):
+    counts[key] = counts.get(key, 0) + amount
+
+def render_report(report):
+    entries = report['entries'] or 1
+    lines = [
+        f"Entries audited:            {report['entries']}",
+        f"Distinct passwords (est.):  {report['distinct_passwords']}",
+        f"Duplicate accounts beyond the first per password (est.): {report['duplicate_accounts']} "
+        f"({report['duplicate_accounts'] / entries:.1%})",
+        "",
+        "Most shared passwords (keyed hash id, est. accounts):",
+    ]
+    for entry in report['most_shared'][:20]:
+        lines.append(f"  {entry['id']}  {entry['accounts']:>8}  {entry['strength']}")
+    for title, counts in (("Strength", report['strength']), ("Score", report['score']),
+                          ("Entropy (bits)", report['entropy_bits']), ("Failed checks", report['failures']),
+                          ("Decided early by", report['decided_by'])):
+        if not counts:
+            continue
+        lines.append("")
+        lines.append(f"{title}:")
+        for key, value in counts.items():
+            lines.append(f"  {key:<40} {value:>10}  {value / entries:6.1%}")
+    return "\n".join(lines) + "\n"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge audit sketches written by bulk_audit.py --sketch and report on them.")
+    parser.add_argument('sketches', nargs='+', help="sketch files built with the same key")
+    parser.add_argument('-o', '--output', help="also save the merged sketch here")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    merged = AuditSketch.load(args.sketches[0])
+    for path in args.sketches[1:]:
+        merged.merge(AuditSketch.load(path))
+    if args.output:
+        merged.save(args.output)
+    report = merged.report()
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        sys.stdout.write(render_report(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import argparse, csv, io, json, os, sys
+from collections import deque
+
+from password_logic import (
+    analyze_record, engine_fingerprint, load_word_dictionary, load_common_passwords,
+    Result, STRENGTHS, FEEDBACK_MESSAGES
+)
+from result_cache import ResultCache, DEFAULT_MAX_BYTES, load_secret
+from audit_sketch import AuditSketch, render_report
+from metrics import REGISTRY as METRICS
+from shared_artifacts import scoring_pool, release_artifacts
+
+BATCH_SIZE = 2048
+# Line numbers of skipped lines reported back, beyond the count
+MALFORMED_LINES_KEPT = 10
+
+def score_password(password, cache=None, early_exit=True):
+    # Bulk audits stop at the first analyzer that decides the strength unless a full report is asked for
+    result = _cached(cache, password)
+    if result is None:
+        result = analyze_record(password, early_exit)
+        if cache is not None:
+            cache.put(password, result.to_list())
+    return result
+
+def _cached(cache, password):
+    values = cache.get(password) if cache is not None else None
+    return Result.from_list(values) if values is not None else None
+
+def audit_passwords(passwords, cache=None, early_exit=True):
+    for password in passwords:
+        yield score_password(password, cache, early_exit)
+
+def score_batch(passwords, early_exit=True):
+    # Runs in pool workers; their metrics travel back with the results
+    return [analyze_record(password, early_exit) for password in passwords], METRICS.drain()
+
+def score_entries(entries, cache=None, early_exit=True, pool=None, processes=1):
+    # Yields (line number, account, password, result) in input order. Cache lookups stay
+    # in this process; with a pool, misses are scored a batch at a time with a
+    # few batches in flight so reading the input never runs far ahead.
+    pending = deque()
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) == BATCH_SIZE:
+            pending.append(_submit(batch, cache, early_exit, pool))
+            batch = []
+            while len(pending) > 2 * processes:
+                yield from _collect(pending.popleft(), cache)
+    if batch:
+        pending.append(_submit(batch, cache, early_exit, pool))
+    while pending:
+        yield from _collect(pending.popleft(), cache)
+
+def _submit(batch, cache, early_exit, pool):
+    results = [_cached(cache, password) for _, _, password in batch]
+    missing = [password for (_, _, password), result in zip(batch, results) if result is None]
+    if pool is None:
+        job = [analyze_record(password, early_exit) for password in missing]
+    else:
+        job = pool.apply_async(score_batch, (missing, early_exit))
+    return batch, results, missing, job
+
+def _collect(submitted, cache):
+    batch, results, missing, job = submitted
+    if isinstance(job, list):
+        scored = iter(job)
+    else:
+        scored, worker_metrics = job.get()
+        METRICS.merge(worker_metrics)
+        scored = iter(scored)
+
+    for (line_number, account, password), result in zip(batch, results):
+        if result is None:
+            result = next(scored)
+            if cache is not None:
+                cache.put(password, result.to_list())
+        yield line_number, account, password, result
+
+def read_entries(path, separator=None, malformed=None):
+    # Lines without the separator are skipped and only counted in malformed
+    # (with the first few line numbers), since the whole line may be a password
+    with open(path, encoding='utf-8', errors='surrogateescape') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            if separator is None:
+                yield line_number, None, line
+                continue
+            account, found, password = line.partition(separator)
+            if found:
+                yield line_number, account, password
+            elif malformed is not None:
+                malformed['count'] += 1
+                if len(malformed['lines']) < MALFORMED_LINES_KEPT:
+                    malformed['lines'].append(line_number)
+
+class JsonlWriter:
+    # Rows are formatted directly; only the account and analyzer name need escaping
+    def __init__(self, out, feedback_text=False):
+        self.out = out
+        self.feedback_text = feedback_text
+
+    def write(self, line_number, account, result):
+        account = '' if account is None else f',"account":{json.dumps(account, ensure_ascii=False)}'
+        entropy = 'null' if result.entropy is None else result.entropy
+        score = 'null' if result.score is None else result.score
+        extra = '' if result.decided_by is None else f',"decided_by":{json.dumps(result.decided_by, ensure_ascii=False)}'
+        if self.feedback_text:
+            extra += f',"feedback":{json.dumps(result.feedback(), ensure_ascii=False)}'
+        self.out.write(f'{{"line":{line_number}{account},"entropy":{entropy},"strength":"{STRENGTHS[result.strength]}",'
+                       f'"score":{score},"feedback_codes":{result.feedback_codes}{extra}}}\n')
+
+class CsvWriter:
+    def __init__(self, out, feedback_text=False):
+        self.writer = csv.writer(out)
+        self.feedback_text = feedback_text
+        header = ['line', 'account', 'entropy', 'strength', 'score', 'feedback_codes', 'decided_by']
+        self.writer.writerow(header + ['feedback'] if feedback_text else header)
+
+    def write(self, line_number, account, result):
+        row = [line_number, account, result.entropy, STRENGTHS[result.strength], result.score,
+               result.feedback_codes, result.decided_by]
+        if self.feedback_text:
+            row.append(' | '.join(result.feedback()))
+        self.writer.writerow(row)
+
+WRITERS = {'jsonl': JsonlWriter, 'csv': CsvWriter}
+
+def open_output(path):
+    # Accounts keep undecodable input bytes as surrogates (see read_entries);
+    # they are written back as the same bytes
+    if path == '-':
+        sys.stdout.flush()
+        return io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='surrogateescape', newline='',
+                                write_through=True)
+    return open(path, 'w', encoding='utf-8', errors='surrogateescape', newline='')
+
+def audit_file(input_path, output_path, cache_path=None, max_cache_bytes=DEFAULT_MAX_BYTES, separator=None,
+               early_exit=True, workers=1, sketch=None, output_format='jsonl', feedback_text=False):
+    cache = None
+    if cache_path:
+        cache = ResultCache(cache_path, max_bytes=max_cache_bytes, fingerprint=engine_fingerprint(early_exit))
+    pool = artifacts = None
+    if workers > 1:
+        pool, artifacts = scoring_pool(workers)
+    out = open_output(output_path)
+    writer = WRITERS[output_format](out, feedback_text)
+    count = 0
+    malformed = {'count': 0, 'lines': []}
+    try:
+        entries = read_entries(input_path, separator, malformed)
+        for line_number, account, password, result in score_entries(entries, cache, early_exit, pool, workers):
+            if sketch is not None:
+                sketch.add(password, result)
+            writer.write(line_number, account, result)
+            count += 1
+    finally:
+        if output_path == '-':
+            out.detach()
+        else:
+            out.close()
+        if cache is not None:
+            cache.close()
+        if pool is not None:
+            pool.terminate()
+            release_artifacts(artifacts)
+
+    return {
+        'entries': count,
+        'cache_hits': cache.hits if cache is not None else 0,
+        'malformed': malformed['count'],
+        'malformed_lines': malformed['lines'],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit a credential export and write one result per line.")
+    parser.add_argument('input', nargs='?', help="file with one password (or account<sep>password) per line")
+    parser.add_argument('-o', '--output', default='-', help="output path (default: stdout)")
+    parser.add_argument('--format', choices=sorted(WRITERS), default='jsonl', help="output format")
+    parser.add_argument('--feedback-text', action='store_true',
+                        help="also write feedback messages, not just their codes")
+    parser.add_argument('--list-feedback-codes', action='store_true', help="print what each feedback code bit means")
+    parser.add_argument('--cache', help="result cache file; unchanged entries are not rescored")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="maximum cache size in MiB")
+    parser.add_argument('--separator', help="split each line into account and password on this string")
+    parser.add_argument('--dictionary', help="word trie built by word_trie.py for substring word detection")
+    parser.add_argument('--common-passwords', help="PREFIX of a list built by wordlist_compiler.py; replaces the built-in list")
+    parser.add_argument('--metrics', help="write Prometheus text-format metrics to this file when done")
+    parser.add_argument('--full-report', action='store_true',
+                        help="run every analyzer even when the strength is already decided")
+    parser.add_argument('--workers', type=int, default=1, help="score in this many worker processes")
+    parser.add_argument('--report', help="write a password reuse and results summary to this file ('-' for stderr)")
+    parser.add_argument('--sketch', help="save the summary as a sketch that audit_sketch.py can merge with others")
+    parser.add_argument('--sketch-key', help="key file for hashing passwords into the sketch (default: SKETCH.key); "
+                                             "share it between runs whose sketches will be merged")
+    args = parser.parse_args(argv)
+
+    if args.list_feedback_codes:
+        for index, message in enumerate(FEEDBACK_MESSAGES):
+            print(f"{1 << index}\t{message}")
+        return
+    if args.input is None:
+        parser.error("the input file is required")
+    if args.dictionary:
+        load_word_dictionary(args.dictionary)
+    if args.common_passwords:
+        bloom_path = args.common_passwords + '.bloom'
+        load_common_passwords(args.common_passwords + '.words', bloom_path if os.path.exists(bloom_path) else None)
+
+    sketch = None
+    if args.report or args.sketch:
+        key_path = args.sketch_key or (args.sketch + '.key' if args.sketch else None)
+        sketch = AuditSketch(load_secret(key_path) if key_path else None)
+
+    # Enabled before any worker is forked, so workers collect too
+    METRICS.enabled = bool(args.metrics)
+    summary = audit_file(args.input, args.output, args.cache, args.cache_size * 1024 * 1024, args.separator,
+                         early_exit=not args.full_report, workers=args.workers, sketch=sketch,
+                         output_format=args.format, feedback_text=args.feedback_text)
+    print(f"Audited {summary['entries']} entries ({summary['cache_hits']} from cache)", file=sys.stderr)
+    if summary['malformed']:
+        shown = ', '.join(map(str, summary['malformed_lines']))
+        more = ', ...' if summary['malformed'] > len(summary['malformed_lines']) else ''
+        print(f"Skipped {summary['malformed']} line(s) without the separator (lines {shown}{more})", file=sys.stderr)
+    if args.sketch:
+        sketch.save(args.sketch)
+    if args.report == '-':
+        sys.stderr.write(render_report(sketch.report()))
+    elif args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(render_report(sketch.report()))
+    if args.metrics:
+        METRICS.write(args.metrics)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import math, secrets, string, threading
+from collections import OrderedDict, deque
+
+from password_logic import COMMON_SEQUENCES
+
+DEFAULT_SYMBOLS = "!@#$%^&*()-_=+[]{}|;:,.<>?"
+
+# Character classes, using the same tests as calculate_entropy
+LOWER, UPPER, DIGIT, SYMBOL = range(4)
+
+def char_class(c):
+    if c.islower():
+        return LOWER
+    if c.isupper():
+        return UPPER
+    if c.isdigit():
+        return DIGIT
+    if c in string.punctuation:
+        return SYMBOL
+    return None
+
+class PasswordPolicy:
+    def __init__(self, length=16, min_lower=1, min_upper=1, min_digits=1, min_symbols=1,
+                 symbols=DEFAULT_SYMBOLS, allowed=None, banned="", max_repeat=2,
+                 avoid_patterns=True, allow_leading_symbol=True):
+        # max_repeat limits runs of the same character (case-insensitive, like
+        # has_common_patterns); avoid_patterns also rules out the sequences it flags
+        self.length = length
+        self.minimums = (min_lower, min_upper, min_digits, min_symbols)
+        base = allowed if allowed is not None else string.ascii_letters + string.digits + symbols
+        self.alphabet = ''.join(sorted(set(base) - set(banned)))
+        self.max_repeat = max_repeat
+        self.avoid_patterns = avoid_patterns
+        self.allow_leading_symbol = allow_leading_symbol
+
+    def key(self):
+        return (self.minimums, self.alphabet, self.max_repeat, self.avoid_patterns, self.allow_leading_symbol)
+
+    def banned_substrings(self):
+        folded = sorted(set(c.lower() for c in self.alphabet))
+        max_repeat = self.max_repeat
+        banned = []
+        if self.avoid_patterns:
+            max_repeat = 2 if max_repeat is None else min(max_repeat, 2)
+            for sequences in COMMON_SEQUENCES:
+                banned.extend(sequences.split('|'))
+        if max_repeat is not None:
+            banned.extend(c * (max_repeat + 1) for c in folded)
+        return banned
+
+def build_automaton(alphabet, banned):
+    # Aho-Corasick DFA over case-folded characters. Returns the transition table
+    # of live states (state 0 is the start); None marks a banned substring.
+    folded = sorted(set(c.lower() for c in alphabet))
+    goto = [{}]
+    dead = [False]
+    for word in banned:
+        if any(ch not in folded for ch in word):
+            continue
+        state = 0
+        for ch in word:
+            if ch not in goto[state]:
+                goto[state][ch] = len(goto)
+                goto.append({})
+                dead.append(False)
+            state = goto[state][ch]
+        dead[state] = True
+
+    fail = [0] * len(goto)
+    delta = [dict() for _ in goto]
+    for ch in folded:
+        delta[0][ch] = goto[0].get(ch, 0)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        dead[state] = dead[state] or dead[fail[state]]
+        for ch in folded:
+            child = goto[state].get(ch)
+            if child is None:
+                delta[state][ch] = delta[fail[state]][ch]
+            else:
+                fail[child] = delta[fail[state]][ch] if state else 0
+                delta[state][ch] = child
+                queue.append(child)
+
+    live = [state for state in range(len(goto)) if not dead[state]]
+    number = {state: index for index, state in enumerate(live)}
+    return [{ch: number.get(delta[state][ch]) for ch in folded} for state in live]
+
+class ConstrainedGenerator:
+    # Counts the strings that satisfy a policy with a DP over (automaton state,
+    # class counts so far), then samples one character at a time weighted by
+    # the number of valid completions, so every valid password is equally likely.
+    # Count vectors for all class-count states are packed side by side into
+    # one int per automaton state to keep the DP in C-level big-int arithmetic.
+    # Building levels costs roughly prod(minimum + 1) * max_length**2: a few
+    # milliseconds for the app's policies, about two seconds for length 64
+    # with four of each class.
+    def __init__(self, policy, max_length):
+        if not policy.alphabet:
+            raise ValueError("Policy allows no characters")
+        self.policy = policy
+        self.max_length = max_length
+        self.delta = build_automaton(policy.alphabet, policy.banned_substrings())
+
+        minimums = policy.minimums
+        self.radix = []
+        size = 1
+        for minimum in minimums:
+            self.radix.append(size)
+            size *= minimum + 1
+        self.count_states = size
+        self.slot_bits = max_length * math.ceil(math.log2(len(policy.alphabet) + 1)) + 1
+        self.slot_mask = (1 << self.slot_bits) - 1
+
+        # Slots whose count for class k can still go up
+        self.open_masks = []
+        for k, minimum in enumerate(minimums):
+            mask = 0
+            for index in range(size):
+                if (index // self.radix[k]) % (minimum + 1) < minimum:
+                    mask |= self.slot_mask << (index * self.slot_bits)
+            self.open_masks.append(mask)
+        self.all_slots = (1 << (size * self.slot_bits)) - 1
+
+        self.characters = [(c, char_class(c), c.lower()) for c in policy.alphabet]
+        # Most characters lead every state where they lead the start state, so
+        # each state's moves are stored as corrections to the start state's:
+        # per class, target -> signed multiplicity, None meaning banned
+        start = self.delta[0]
+        self.classes = sorted({k for _, k, _ in self.characters}, key=lambda k: -1 if k is None else k)
+        self.start_moves = {k: {} for k in self.classes}
+        for c, k, folded in self.characters:
+            _tally(self.start_moves[k], start[folded], 1)
+        self.corrections = []
+        for transitions in self.delta:
+            by_class = {}
+            for c, k, folded in self.characters:
+                if transitions[folded] != start[folded]:
+                    group = by_class.setdefault(k, {})
+                    _tally(group, transitions[folded], 1)
+                    _tally(group, start[folded], -1)
+            self.corrections.append({k: [(target, multiplicity) for target, multiplicity in group.items() if multiplicity]
+                                     for k, group in by_class.items()})
+
+        # Zero characters left: valid only once every minimum is met
+        done = 1 << ((size - 1) * self.slot_bits)
+        self.levels = [[done] * len(self.delta)]
+        self._lock = threading.Lock()
+
+    def _bump(self, index, k):
+        if k is None:
+            return index
+        minimum = self.policy.minimums[k]
+        if (index // self.radix[k]) % (minimum + 1) < minimum:
+            return index + self.radix[k]
+        return index
+
+    def _gather(self, vector, k):
+        # Slot i of the result takes slot bump(i, k) of vector
+        if k is None:
+            return vector
+        mask = self.open_masks[k]
+        return ((vector >> (self.radix[k] * self.slot_bits)) & mask) | (vector & (self.all_slots ^ mask))
+
+    def _level(self, remaining):
+        if remaining < len(self.levels):
+            return self.levels[remaining]
+        with self._lock:
+            self._grow(remaining)
+        return self.levels[remaining]
+
+    def _grow(self, remaining):
+        # Packed vectors add and subtract slot by slot; every corrected sum is
+        # a true (non-negative) count again before it is gathered
+        while len(self.levels) <= remaining:
+            previous = self.levels[-1]
+            start_sums = {k: sum(multiplicity * previous[target] for target, multiplicity in targets.items())
+                          for k, targets in self.start_moves.items()}
+            level = []
+            for corrections in self.corrections:
+                total = 0
+                for k, summed in start_sums.items():
+                    for target, multiplicity in corrections.get(k, ()):
+                        summed += multiplicity * previous[target]
+                    if summed:
+                        total += self._gather(summed, k)
+                level.append(total)
+            self.levels.append(level)
+
+    def _slot(self, vector, index):
+        return (vector >> (index * self.slot_bits)) & self.slot_mask
+
+    def _choices(self, state, index, remaining, first):
+        following = self._level(remaining - 1)
+        transitions = self.delta[state]
+        for c, k, folded in self.characters:
+            if first and k == SYMBOL and not self.policy.allow_leading_symbol:
+                continue
+            target = transitions[folded]
+            if target is None:
+                continue
+            bumped = self._bump(index, k)
+            weight = self._slot(following[target], bumped)
+            if weight:
+                yield c, target, bumped, weight
+
+    def count(self, length):
+        self._check_length(length)
+        return sum(weight for _, _, _, weight in self._choices(0, 0, length, True))
+
+    def entropy(self, length):
+        count = self.count(length)
+        return math.log2(count) if count else 0.0
+
+    def generate(self, length):
+        self._check_length(length)
+        state, index = 0, 0
+        password = []
+        for position in range(length):
+            choices = list(self._choices(state, index, length - position, position == 0))
+            pick = secrets.randbelow(sum(choice[3] for choice in choices)) if choices else None
+            if pick is None:
+                raise ValueError("No password satisfies this policy")
+            for c, target, bumped, weight in choices:
+                if pick < weight:
+                    break
+                pick -= weight
+            password.append(c)
+            state, index = target, bumped
+        return ''.join(password)
+
+    def _check_length(self, length):
+        if not 1 <= length <= self.max_length:
+            raise ValueError(f"length must be between 1 and {self.max_length}")
+
+def _tally(counts, target, amount):
+    if target is not None:
+        counts[target] = counts.get(target, 0) + amount
+
+_GENERATORS = OrderedDict()
+_GENERATORS_LOCK = threading.Lock()
+MAX_CACHED_GENERATORS = 8
+
+def generator_for(policy):
+    # A DP table serves every length up to its max_length, so a cached one for
+    # the same policy shape is reused when long enough; otherwise one is built
+    # for exactly this length, since slot width and level count grow with it
+    shape = policy.key()
+    with _GENERATORS_LOCK:
+        key = next((key for key in reversed(_GENERATORS) if key[0] == shape and key[1] >= policy.length),
+                   (shape, policy.length))
+        generator = _GENERATORS.pop(key, None)
+        if generator is None:
+            generator = ConstrainedGenerator(policy, policy.length)
+        _GENERATORS[key] = generator
+        while len(_GENERATORS) > MAX_CACHED_GENERATORS:
+            _GENERATORS.popitem(last=False)
+    return generator
+
+def generate_password(policy):
+    return generator_for(policy).generate(policy.length)
+
+def policy_entropy(policy):
+    # Exact entropy in bits of a uniform pick from every password the policy allows
+    return generator_for(policy).entropy(policy.length)
@@ -0,0 +1,159 @@
+import argparse, hashlib, json, os, platform, sys, time
+
+# Calibrates the guess rate behind time_to_crack. Each supported hash is timed
+# on this machine (one core, through hashlib), then scaled by a hardware
+# multiplier standing in for an attacker's rig. The resulting profile is a
+# small JSON file that password_logic.load_hash_rates reads.
+#
+# A fast digest of one short password takes less time than the Python call
+# around it, so those are timed on a large buffer instead: salt plus password
+# fit in one compression block, making blocks per second the guess rate.
+# The per-call rate is kept in the profile for reference.
+
+ALGORITHMS = ('md5', 'sha1', 'sha256', 'pbkdf2_sha256', 'scrypt')
+FAST_DIGESTS = ('md5', 'sha1', 'sha256')
+DEFAULT_ALGORITHM = 'pbkdf2_sha256'
+DEFAULT_PBKDF2_ITERATIONS = 600000
+DEFAULT_SCRYPT = {'n': 2 ** 14, 'r': 8, 'p': 1}
+PROFILE_FORMAT = 1
+
+# Rough speed-up of one current high-end GPU over a single core running this
+# benchmark; memory-hard scrypt gains far less from GPUs than anything else
+DEFAULT_MULTIPLIERS = {
+    'md5': 8000,
+    'sha1': 1200,
+    'sha256': 650,
+    'pbkdf2_sha256': 8000,
+    'scrypt': 300,
+}
+
+SALT = b'password-guardian'
+DIGEST_BUFFER = 1 << 20
+
+def _candidates(count=4096):
+    return [f"candidate{i:06d}".encode() for i in range(count)]
+
+def hash_function(algorithm, pbkdf2_iterations=DEFAULT_PBKDF2_ITERATIONS, scrypt=None):
+    scrypt = scrypt or DEFAULT_SCRYPT
+    if algorithm in FAST_DIGESTS:
+        constructor = getattr(hashlib, algorithm)
+        return lambda password: constructor(SALT + password).digest()
+    if algorithm == 'pbkdf2_sha256':
+        return lambda password: hashlib.pbkdf2_hmac('sha256', password, SALT, pbkdf2_iterations)
+    if algorithm == 'scrypt':
+        maxmem = 256 * scrypt['n'] * scrypt['r'] * scrypt['p'] + (1 << 20)
+        return lambda password: hashlib.scrypt(password, salt=SALT, n=scrypt['n'], r=scrypt['r'],
+                                               p=scrypt['p'], maxmem=maxmem)
+    raise ValueError(f"Unknown hash algorithm: {algorithm}")
+
+def measure(function, duration=0.5, rounds=3):
+    # Hashes in growing batches so the clock is read rarely for fast digests;
+    # best of several rounds, so a busy moment does not drag the rate down
+    candidates = _candidates()
+    best = 0.0
+    for _ in range(rounds):
+        hashed, batch = 0, 1
+        started = time.perf_counter()
+        while True:
+            for password in candidates[:batch]:
+                function(password)
+            hashed += batch
+            elapsed = time.perf_counter() - started
+            if elapsed >= duration:
+                break
+            remaining = (duration - elapsed) * hashed / elapsed
+            batch = max(1, min(batch * 2, len(candidates), int(remaining) + 1))
+        best = max(best, hashed / elapsed)
+    return best
+
+def measure_digest(algorithm, duration=0.5, rounds=3):
+    # Compression blocks per second on a large buffer, free of call overhead
+    constructor = getattr(hashlib, algorithm)
+    buffer = bytes(DIGEST_BUFFER)
+    calls = measure(lambda _: constructor(buffer).digest(), duration, rounds)
+    return calls * len(buffer) / constructor().block_size
+
+def calibrate(algorithms=ALGORITHMS, multipliers=None, devices=1, duration=0.5,
+              pbkdf2_iterations=DEFAULT_PBKDF2_ITERATIONS, scrypt=None, default=DEFAULT_ALGORITHM, progress=None):
+    multipliers = dict(DEFAULT_MULTIPLIERS, **(multipliers or {}))
+    scrypt = scrypt or DEFAULT_SCRYPT
+    measured = {}
+    call_rates = {}
+    for algorithm in algorithms:
+        call_rates[algorithm] = measure(hash_function(algorithm, pbkdf2_iterations, scrypt), duration)
+        if algorithm in FAST_DIGESTS:
+            measured[algorithm] = measure_digest(algorithm, duration)
+        else:
+            measured[algorithm] = call_rates[algorithm]
+        if progress is not None:
+            progress(algorithm, measured[algorithm])
+    return {
+        'format': PROFILE_FORMAT,
+        'created': int(time.time()),
+        'machine': {'platform': platform.platform(), 'processor': platform.processor(),
+                    'python': platform.python_version()},
+        'parameters': {'pbkdf2_iterations': pbkdf2_iterations, 'scrypt': scrypt},
+        'measured': measured,
+        'call_rates': call_rates,
+        'multipliers': {algorithm: multipliers[algorithm] for algorithm in measured},
+        'devices': devices,
+        'rates': {algorithm: rate * multipliers[algorithm] * devices for algorithm, rate in measured.items()},
+        'default': default if default in measured else next(iter(measured)),
+    }
+
+def save_profile(profile, path):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+def load_profile(path):
+    with open(path) as f:
+        profile = json.load(f)
+    if profile.get('format') != PROFILE_FORMAT or not profile.get('rates'):
+        raise ValueError(f"{path} is not a hash rate profile")
+    return profile
+
+def profile_rate(profile, algorithm=None):
+    algorithm = algorithm or profile['default']
+    if algorithm not in profile['rates']:
+        raise ValueError(f"Profile has no rate for {algorithm}")
+    return profile['rates'][algorithm]
+
+def _multiplier(value):
+    algorithm, _, factor = value.partition('=')
+    if algorithm not in ALGORITHMS or not factor:
+        raise argparse.ArgumentTypeError(f"expected ALGORITHM=FACTOR with ALGORITHM one of {', '.join(ALGORITHMS)}")
+    return algorithm, float(factor)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark password hashing and store the guess rates time_to_crack uses.")
+    parser.add_argument('-o', '--output', default='hash_rates.json', help="profile to write")
+    parser.add_argument('--algorithms', nargs='+', choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument('--default', choices=ALGORITHMS, default=DEFAULT_ALGORITHM,
+                        help="hash used for crack-time estimates (the one actually deployed)")
+    parser.add_argument('--multiplier', action='append', type=_multiplier, default=[], metavar='ALGORITHM=FACTOR',
+                        help="attacker speed-up over this machine for one algorithm")
+    parser.add_argument('--devices', type=int, default=1, help="number of attacker devices")
+    parser.add_argument('--pbkdf2-iterations', type=int, default=DEFAULT_PBKDF2_ITERATIONS)
+    parser.add_argument('--scrypt-n', type=int, default=DEFAULT_SCRYPT['n'])
+    parser.add_argument('--scrypt-r', type=int, default=DEFAULT_SCRYPT['r'])
+    parser.add_argument('--scrypt-p', type=int, default=DEFAULT_SCRYPT['p'])
+    parser.add_argument('--duration', type=float, default=0.5, help="seconds per measurement round")
+    args = parser.parse_args(argv)
+
+    def report(algorithm, rate):
+        print(f"  {algorithm}: {rate:,.1f} hashes/s", file=sys.stderr)
+
+    print("Measuring on this machine (one core):", file=sys.stderr)
+    profile = calibrate(
+        args.algorithms, dict(args.multiplier), args.devices, args.duration, args.pbkdf2_iterations,
+        {'n': args.scrypt_n, 'r': args.scrypt_r, 'p': args.scrypt_p}, args.default, report
+    )
+    save_profile(profile, args.output)
+    print(f"Attacker estimate ({profile['devices']} device(s)):", file=sys.stderr)
+    for algorithm, rate in profile['rates'].items():
+        print(f"  {algorithm}: {rate:.3g} guesses/s", file=sys.stderr)
+    print(f"Wrote {args.output}; crack times will assume {profile['default']}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
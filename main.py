@@ -1,4 +1,3 @@
-import math, string, random, re
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
@@ -21,153 +20,171 @@ from kivy.metrics import dp, sp
 from kivy.uix.widget import Widget
 from kivy.graphics import Color, RoundedRectangle, Line, Ellipse
 from kivy.uix.actionbar import ActionBar, ActionView, ActionPrevious, ActionButton
-import threading
-
-# Common passwords list (top 100 most common)
-COMMON_PASSWORDS = {
-    '123456', 'password', '123456789', '12345678', '12345', '1234567', '1234567890',
-    'qwerty', 'abc123', 'million', '000000', '1234', 'iloveyou', 'aaron431',
-    'password1', 'qqww1122', '123', 'omgpop', '123321', '654321', 'qwertyuiop',
-    'qwer123456', '123654', '123abc', 'password123', '111111', 'monkey', '11111111',
-    'dragon', 'login', 'princess', 'qwerty123', 'solo', 'passw0rd', 'starwars',
-    'charlie', 'aa123456', '1q2w3e4r', '123qwe', 'zxcvbnm', 'asdf', 'football',
-    'asdfgh', 'master', 'michael', 'superman', 'iloveyou1', 'qwertyui', 'welcome',
-    'monkey1', 'sunshine', 'password12', '123456a', 'admin', 'letmein'
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.spinner import Spinner
+from kivy.uix.filechooser import FileChooserListView
+from kivy.clock import mainthread
+from kivy.logger import Logger
+import threading, os
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from password_logic import (
+    analyze_record, generate_secure_password, time_to_crack, load_word_dictionary, load_common_passwords, load_hash_rates,
+    STRENGTHS
+)
+from audit_results import AuditResultFile
+
+# Compiled dictionaries (word_trie.py, wordlist_compiler.py); add "dawg,words,bloom"
+# to source.include_exts to ship them with the app
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DICTIONARY_PATH = os.path.join(APP_DIR, 'words.dawg')
+COMMON_PASSWORDS_PATH = os.path.join(APP_DIR, 'common.words')
+COMMON_PASSWORDS_BLOOM_PATH = os.path.join(APP_DIR, 'common.bloom')
+# Guess rates from hash_calibration.py; ship hash_rates.json (add "json" to source.include_exts)
+HASH_RATES_PATH = os.path.join(APP_DIR, 'hash_rates.json')
+
+# -------- VIEW MODEL --------
+STRENGTH_COLORS = {
+    "Very Weak": "#ef4444",
+    "Weak": "#f97316",
+    "Fair": "#eab308",
+    "Good": "#22c55e",
+    "Strong": "#16a34a",
+    "Very Strong": "#15803d"
 }
 
-# -------- PASSWORD LOGIC --------
-def calculate_entropy(password):
-    char_sets = 0
-    if any(c.islower() for c in password): char_sets += 26
-    if any(c.isupper() for c in password): char_sets += 26
-    if any(c.isdigit() for c in password): char_sets += 10
-    if any(c in string.punctuation for c in password): char_sets += 32
-    
-    L = len(password)
-    N = char_sets if char_sets > 0 else 1
-    
-    entropy = L * math.log2(N)
-    if has_common_patterns(password):
-        entropy *= 0.7
-    if password.lower() in COMMON_PASSWORDS:
-        entropy *= 0.3
-    
-    return round(entropy, 2)
-
-def has_common_patterns(password):
-    patterns = [
-        r'(.)\1{2,}',
-        r'(012|123|234|345|456|567|678|789|890)',
-        r'(abc|bcd|cde|def|efg|fgh|ghi|hij|ijk|jkl|klm|lmn|mno|nop|opq|pqr|qrs|rst|stu|tuv|uvw|vwx|wxy|xyz)',
-        r'(qwe|wer|ert|rty|tyu|yui|uio|iop|asd|sdf|dfg|fgh|ghj|hjk|jkl|zxc|xcv|cvb|vbn|bnm)',
-    ]
-    return any(re.search(pattern, password.lower()) for pattern in patterns)
-
-def get_strength(entropy, password):
-    if password.lower() in COMMON_PASSWORDS:
-        return "Very Weak"
-    elif entropy < 30:
-        return "Weak"
-    elif entropy < 50:
-        return "Fair"
-    elif entropy < 70:
-        return "Good"
-    elif entropy < 90:
-        return "Strong"
-    else:
-        return "Very Strong"
-
-def get_detailed_feedback(password, entropy):
-    feedback = []
-    score = 0
-    
-    if len(password) < 8:
-        feedback.append("❌ Too short (minimum 8 characters)")
-    elif len(password) < 12:
-        feedback.append("⚠️ Consider longer password (12+ chars)")
-        score += 1
-    else:
-        feedback.append("✅ Good length")
-        score += 2
-    
-    if not any(c.isupper() for c in password):
-        feedback.append("❌ Add uppercase letters")
-    else:
-        feedback.append("✅ Contains uppercase")
-        score += 1
-        
-    if not any(c.islower() for c in password):
-        feedback.append("❌ Add lowercase letters")
-    else:
-        feedback.append("✅ Contains lowercase")
-        score += 1
-        
-    if not any(c.isdigit() for c in password):
-        feedback.append("❌ Add numbers")
-    else:
-        feedback.append("✅ Contains numbers")
-        score += 1
-        
-    if not any(c in string.punctuation for c in password):
-        feedback.append("❌ Add special characters")
-    else:
-        feedback.append("✅ Contains symbols")
-        score += 1
+STRENGTH_PROGRESS = {
+    "Very Weak": 15,
+    "Weak": 30,
+    "Fair": 50,
+    "Good": 70,
+    "Strong": 85,
+    "Very Strong": 100
+}
+
+def build_display_state(password):
+    if not password:
+        return {
+            'strength_text': "Password Strength: Not Analyzed",
+            'strength_color': "#2d3748",
+            'entropy_text': "",
+            'progress': 0,
+            'time_text': "Time to crack: Not calculated",
+            'score_text': "Score: 0/8",
+            'feedback_text': "Enter a password to see detailed security analysis and recommendations...",
+        }
     
-    if has_common_patterns(password):
-        feedback.append("⚠️ Avoid common patterns")
-    else:
-        feedback.append("✅ No obvious patterns")
-        score += 1
-        
-    if password.lower() in COMMON_PASSWORDS:
-        feedback.append("❌ This is a common password!")
-    else:
-        feedback.append("✅ Not a common password")
-        score += 1
+    result = analyze_record(password)
+    strength = result.strength_name
     
-    return feedback, score
+    return {
+        'strength_text': f"Password Strength: {strength}",
+        'strength_color': STRENGTH_COLORS.get(strength, "#64748b"),
+        'entropy_text': f"{result.entropy} bits",
+        'progress': STRENGTH_PROGRESS.get(strength, 0),
+        'time_text': f"Time to crack: {time_to_crack(result.entropy)}",
+        'score_text': f"Score: {result.score}/8",
+        'feedback_text': "\n".join(result.feedback()),
+    }
+
+SORT_OPTIONS = {
+    "Line": ('line', False),
+    "Weakest first": ('strength', False),
+    "Strongest first": ('strength', True),
+    "Lowest entropy": ('entropy', False),
+    "Highest entropy": ('entropy', True),
+    "Lowest score": ('score', False),
+    "Highest score": ('score', True),
+}
 
-def generate_secure_password(length=16, use_symbols=True, exclude_ambiguous=True):
-    chars = string.ascii_letters + string.digits
-    if use_symbols:
-        chars += "!@#$%^&*()-_=+[]{}|;:,.<>?"
+# Minimum entropy filters, at the strength_for_entropy boundaries
+ENTROPY_FILTERS = {
+    "Any entropy": None,
+    "30+ bits": 30,
+    "50+ bits": 50,
+    "70+ bits": 70,
+    "90+ bits": 90,
+}
+
+SCORE_FILTERS = {"Any score": None, **{f"Score {score}+": score for score in range(1, 9)}}
+
+class DisplayDiff:
+    # Remembers what is on screen so only changed values reach the widgets
+    def __init__(self, initial=None):
+        self.displayed = dict(initial or {})
     
-    if exclude_ambiguous:
-        ambiguous = "0O1lI"
-        chars = ''.join(c for c in chars if c not in ambiguous)
+    def changes(self, state):
+        changed = {key: value for key, value in state.items()
+                   if key not in self.displayed or self.displayed[key] != value}
+        self.displayed.update(changed)
+        return changed
+
+def score_candidate(length, use_symbols, exclude_ambiguous):
+    password = generate_secure_password(length, use_symbols, exclude_ambiguous)
+    result = analyze_record(password)
+    return {
+        'password': password,
+        'strength_text': f"Strength: {result.strength_name}",
+        'entropy_text': f"Entropy: {result.entropy} bits",
+        'time_text': time_to_crack(result.entropy),
+    }
+
+class CandidatePrefetcher:
+    # Keeps a few generated and scored passwords ready for the current
+    # generator settings. They are made on a worker thread and dropped as
+    # soon as the settings change, so Generate never waits on the analyzers.
+    def __init__(self, size=4):
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        self._settings = None
+        self._generation = 0
+        self._ready = deque()
+        self._pending = 0
     
-    password = []
-    password.append(random.choice(string.ascii_lowercase))
-    password.append(random.choice(string.ascii_uppercase))
-    password.append(random.choice(string.digits))
-    if use_symbols:
-        password.append(random.choice("!@#$%^&*"))
+    def set_settings(self, settings):
+        with self._lock:
+            if settings == self._settings:
+                return
+            self._settings = settings
+            self._generation += 1
+            self._ready.clear()
+            self._pending = 0
+        self._refill()
     
-    for _ in range(length - len(password)):
-        password.append(random.choice(chars))
+    def take(self, settings):
+        self.set_settings(settings)
+        with self._lock:
+            candidate = self._ready.popleft() if self._ready else None
+        self._refill()
+        # Nothing buffered yet (first use, or clicks faster than the refill)
+        return candidate or score_candidate(*settings)
     
-    random.shuffle(password)
-    return ''.join(password)
-
-def time_to_crack(entropy):
-    guesses_per_sec = 1e12
-    seconds = (2 ** entropy) / (2 * guesses_per_sec)
+    def _refill(self):
+        with self._lock:
+            missing = self.size - len(self._ready) - self._pending
+            self._pending += max(missing, 0)
+            generation, settings = self._generation, self._settings
+        for _ in range(missing):
+            self._executor.submit(self._produce, generation, settings)
     
-    if seconds < 1:
-        return "Instantly"
-    elif seconds < 60:
-        return f"{seconds:.1f} seconds"
-    elif seconds < 3600:
-        return f"{seconds/60:.1f} minutes"
-    elif seconds < 86400:
-        return f"{seconds/3600:.1f} hours"
-    elif seconds < 31536000:
-        return f"{seconds/86400:.1f} days"
-    elif seconds < 31536000000:
-        return f"{seconds/31536000:.1f} years"
-    else:
-        return "Millions of years"
+    def _produce(self, generation, settings):
+        candidate = None
+        if generation == self._generation:
+            try:
+                candidate = score_candidate(*settings)
+            except Exception:
+                # take() scores on the calling thread instead, where the error surfaces
+                Logger.exception("PasswordGuardian: prefetching a password candidate failed")
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._pending -= 1
+            if candidate is not None:
+                self._ready.append(candidate)
 
 # -------- MODERN UI COMPONENTS --------
 class GradientWidget(Widget):
@@ -348,12 +365,18 @@ class MainScreen(Screen):
             with_previous=False
         )
         
+        results_button = ActionButton(
+            text='Audit Results',
+            on_press=self.show_results
+        )
+        
         about_button = ActionButton(
             text='About',
             on_press=self.show_about
         )
         
         action_view.add_widget(action_previous)
+        action_view.add_widget(results_button)
         action_view.add_widget(about_button)
         action_bar.add_widget(action_view)
         
@@ -364,6 +387,9 @@ class MainScreen(Screen):
         main_layout.add_widget(content)
         self.add_widget(main_layout)
     
+    def show_results(self, instance):
+        self.manager.current = 'results'
+    
     def show_about(self, instance):
         about_content = BoxLayout(orientation='vertical', padding=dp(20), spacing=dp(20))
         
@@ -473,6 +499,243 @@ class MainScreen(Screen):
         close_btn.bind(on_press=lambda x: popup.dismiss())
         popup.open()
 
+class AuditResultRow(RecycleDataViewBehavior, BoxLayout):
+    def __init__(self, **kwargs):
+        super().__init__(orientation='horizontal', padding=[dp(15), 0], spacing=dp(10), **kwargs)
+
+        self.name_label = Label(
+            font_size=sp(14),
+            color=get_color_from_hex("#2d3748"),
+            size_hint=(0.4, 1),
+            halign='left',
+            valign='middle',
+            shorten=True
+        )
+        self.name_label.bind(size=self.name_label.setter('text_size'))
+        self.strength_label = Label(font_size=sp(14), bold=True, size_hint=(0.25, 1))
+        self.entropy_label = Label(font_size=sp(13), color=get_color_from_hex("#4a5568"), size_hint=(0.2, 1))
+        self.score_label = Label(font_size=sp(13), color=get_color_from_hex("#4a5568"), size_hint=(0.15, 1))
+
+        self.add_widget(self.name_label)
+        self.add_widget(self.strength_label)
+        self.add_widget(self.entropy_label)
+        self.add_widget(self.score_label)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.name_label.text = data['name']
+        self.strength_label.text = data['strength']
+        self.strength_label.color = get_color_from_hex(data['color'])
+        self.entropy_label.text = data['entropy']
+        self.score_label.text = data['score']
+
+class ResultsBrowserScreen(Screen):
+    # Browses bulk_audit.py output. The file is indexed on a worker thread into
+    # compact columns (audit_results.py); the RecycleView only ever holds a
+    # window of WINDOW rows, which slides as the user nears either end.
+    WINDOW = 300
+    ROW_HEIGHT = dp(48)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.results = None
+        self.view = array('I')
+        self.window_start = 0
+        self._generation = 0
+        self._shifting = False
+
+        layout = BoxLayout(orientation='vertical')
+
+        action_bar = ActionBar(size_hint=(1, None), height=dp(56))
+        action_bar.background_color = [0.1, 0.2, 0.4, 1]
+        action_view = ActionView()
+        action_previous = ActionPrevious(title='Audit Results', app_icon='', with_previous=True)
+        action_previous.bind(on_press=self.go_back)
+        open_button = ActionButton(text='Open', on_press=self.show_file_chooser)
+        action_view.add_widget(action_previous)
+        action_view.add_widget(open_button)
+        action_bar.add_widget(action_view)
+
+        controls = GridLayout(cols=2, size_hint=(1, None), height=dp(100),
+                              padding=[dp(15), dp(5)], spacing=dp(10))
+        self.strength_spinner = Spinner(text='All strengths', values=['All strengths'] + list(STRENGTHS))
+        self.sort_spinner = Spinner(text='Line', values=list(SORT_OPTIONS))
+        self.entropy_spinner = Spinner(text='Any entropy', values=list(ENTROPY_FILTERS))
+        self.score_spinner = Spinner(text='Any score', values=list(SCORE_FILTERS))
+        for spinner in (self.strength_spinner, self.sort_spinner, self.entropy_spinner, self.score_spinner):
+            spinner.bind(text=self.refresh_view)
+            controls.add_widget(spinner)
+
+        self.status_label = Label(
+            text='Open an audit file (bulk_audit.py --output) to browse its results',
+            font_size=sp(13),
+            color=get_color_from_hex("#4a5568"),
+            size_hint=(1, None),
+            height=dp(30),
+            halign='center'
+        )
+        self.status_label.bind(size=self.status_label.setter('text_size'))
+
+        self.list_view = RecycleView(viewclass=AuditResultRow)
+        row_layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, self.ROW_HEIGHT),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        row_layout.bind(minimum_height=row_layout.setter('height'))
+        self.list_view.add_widget(row_layout)
+        self.list_view.layout_manager = row_layout
+        self.list_view.bind(scroll_y=self.on_list_scroll)
+
+        layout.add_widget(action_bar)
+        layout.add_widget(controls)
+        layout.add_widget(self.status_label)
+        layout.add_widget(self.list_view)
+        self.add_widget(layout)
+
+    def go_back(self, instance):
+        self.manager.current = 'main'
+
+    def show_file_chooser(self, instance):
+        chooser_layout = BoxLayout(orientation='vertical', spacing=dp(10))
+        chooser = FileChooserListView(path=APP_DIR, filters=['*.jsonl'])
+        buttons = BoxLayout(orientation='horizontal', size_hint=(1, None), height=dp(50), spacing=dp(10))
+        open_btn = ModernButton(text='Open', bg_color=[0.2, 0.5, 0.9, 1])
+        cancel_btn = ModernButton(text='Cancel', bg_color=[0.5, 0.5, 0.5, 1])
+        buttons.add_widget(open_btn)
+        buttons.add_widget(cancel_btn)
+        chooser_layout.add_widget(chooser)
+        chooser_layout.add_widget(buttons)
+
+        popup = Popup(title='Open Audit Results', content=chooser_layout, size_hint=(0.95, 0.9), auto_dismiss=False)
+
+        def open_selected(_):
+            if chooser.selection:
+                popup.dismiss()
+                self.load_results(chooser.selection[0])
+
+        open_btn.bind(on_press=open_selected)
+        cancel_btn.bind(on_press=lambda x: popup.dismiss())
+        popup.open()
+
+    def load_results(self, path):
+        if self.results is not None:
+            self.results.close()
+            self.results = None
+        self._generation += 1
+        generation = self._generation
+        self.show_rows(array('I'))
+        self.status_label.text = f"Indexing {os.path.basename(path)}..."
+        threading.Thread(target=self._scan_results, args=(path, generation), daemon=True).start()
+
+    def _scan_results(self, path, generation):
+        results = AuditResultFile(path)
+        try:
+            finished = results.scan(
+                progress=lambda fraction: self._scan_progress(fraction, generation),
+                cancelled=lambda: generation != self._generation
+            )
+        except (OSError, ValueError) as e:
+            results.close()
+            self._scan_failed(str(e), generation)
+            return
+        if finished:
+            self._scan_done(results, generation)
+        else:
+            results.close()
+
+    @mainthread
+    def _scan_progress(self, fraction, generation):
+        if generation == self._generation:
+            self.status_label.text = f"Indexing... {fraction:.0%}"
+
+    @mainthread
+    def _scan_failed(self, message, generation):
+        if generation == self._generation:
+            self.status_label.text = f"Could not read audit file: {message}"
+
+    @mainthread
+    def _scan_done(self, results, generation):
+        if generation != self._generation:
+            results.close()
+            return
+        self.results = results
+        self.refresh_view()
+
+    def refresh_view(self, *args):
+        if self.results is None:
+            return
+        self._generation += 1
+        strength = self.strength_spinner.text
+        sort_key, descending = SORT_OPTIONS[self.sort_spinner.text]
+        filters = {
+            'strength': None if strength not in STRENGTHS else strength,
+            'min_entropy': ENTROPY_FILTERS[self.entropy_spinner.text],
+            'min_score': SCORE_FILTERS[self.score_spinner.text],
+        }
+        threading.Thread(
+            target=self._query_results,
+            args=(self.results, filters, sort_key, descending, self._generation),
+            daemon=True
+        ).start()
+
+    def _query_results(self, results, filters, sort_key, descending, generation):
+        self._query_done(results.query(sort_key=sort_key, descending=descending, **filters), generation)
+
+    @mainthread
+    def _query_done(self, view, generation):
+        if generation != self._generation:
+            return
+        self.show_rows(view)
+        self.status_label.text = f"{len(view)} of {len(self.results)} results"
+
+    def show_rows(self, view):
+        self.view = view
+        self.window_start = 0
+        self.list_view.data = self.window_rows(0)
+        self.list_view.scroll_y = 1
+
+    def window_rows(self, start):
+        rows = []
+        for index in self.view[start:start + self.WINDOW]:
+            row = self.results.row(index)
+            strength = row.get('strength', '')
+            name = f"Line {row.get('line', index + 1)}"
+            if row.get('account'):
+                # Bytes that were not UTF-8 in the export come back as surrogates
+                name += f" · {row['account'].encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')}"
+            rows.append({
+                'name': name,
+                'strength': strength,
+                'color': STRENGTH_COLORS.get(strength, "#64748b"),
+                'entropy': "-" if row.get('entropy') is None else f"{row['entropy']} bits",
+                'score': "-" if row.get('score') is None else f"{row['score']}/8",
+            })
+        return rows
+
+    def on_list_scroll(self, instance, scroll_y):
+        if self._shifting or not self.list_view.data:
+            return
+        if scroll_y < 0.1 and self.window_start + self.WINDOW < len(self.view):
+            self.shift_window(self.WINDOW // 2)
+        elif scroll_y > 0.9 and self.window_start > 0:
+            self.shift_window(-min(self.WINDOW // 2, self.window_start))
+
+    def shift_window(self, rows):
+        # Keep the row at the top of the viewport in place while the window moves
+        view_height = self.list_view.height
+        old_span = max(len(self.list_view.data) * self.ROW_HEIGHT - view_height, 1)
+        top = (1 - self.list_view.scroll_y) * old_span / self.ROW_HEIGHT
+
+        self._shifting = True
+        self.window_start += rows
+        data = self.window_rows(self.window_start)
+        self.list_view.data = data
+        new_span = max(len(data) * self.ROW_HEIGHT - view_height, 1)
+        self.list_view.scroll_y = min(1, max(0, 1 - (top - rows) * self.ROW_HEIGHT / new_span))
+        self._shifting = False
+
+
 class EnhancedPasswordChecker(BoxLayout):
     def __init__(self, **kwargs):
         super().__init__(orientation='vertical', **kwargs)
@@ -677,6 +940,7 @@ class EnhancedPasswordChecker(BoxLayout):
         self.length_slider = Slider(min=8, max=32, value=16, step=1, size_hint=(0.6, 1))
         self.length_value = Label(text="16", size_hint=(0.15, 1), font_size=sp(14))
         self.length_slider.bind(value=self.update_length_label)
+        self.length_slider.bind(value=self.prefetch_candidates)
         length_layout.add_widget(self.length_slider)
         length_layout.add_widget(self.length_value)
         
@@ -686,11 +950,13 @@ class EnhancedPasswordChecker(BoxLayout):
         symbols_box = BoxLayout(orientation='horizontal', size_hint=(0.5, 1))
         symbols_box.add_widget(Label(text="Symbols:", font_size=sp(14), halign='left'))
         self.symbols_switch = Switch(active=True, size_hint=(None, 1), width=dp(50))
+        self.symbols_switch.bind(active=self.prefetch_candidates)
         symbols_box.add_widget(self.symbols_switch)
         
         ambiguous_box = BoxLayout(orientation='horizontal', size_hint=(0.5, 1))
         ambiguous_box.add_widget(Label(text="Exclude Ambiguous:", font_size=sp(14), halign='left'))
         self.ambiguous_switch = Switch(active=True, size_hint=(None, 1), width=dp(50))
+        self.ambiguous_switch.bind(active=self.prefetch_candidates)
         ambiguous_box.add_widget(self.ambiguous_switch)
         
         options_layout.add_widget(symbols_box)
@@ -714,89 +980,81 @@ class EnhancedPasswordChecker(BoxLayout):
         scroll.add_widget(main_layout)
         self.add_widget(scroll)
         
-        # Animation properties
-        self.current_strength = ""
+        # Display state
+        self.view_model = DisplayDiff(build_display_state(""))
+        self._analyze_event = None
+        self._progress_anim = None
+        
+        # Generated passwords, scored ahead of time
+        self.prefetcher = CandidatePrefetcher()
+        self.prefetch_candidates()
     
     def update_length_label(self, instance, value):
         self.length_value.text = str(int(value))
     
+    def generator_settings(self):
+        return int(self.length_slider.value), self.symbols_switch.active, self.ambiguous_switch.active
+    
+    def prefetch_candidates(self, *args):
+        self.prefetcher.set_settings(self.generator_settings())
+    
     def toggle_password_visibility(self, instance):
         self.input.password = not self.input.password
         instance.text = "👁" if self.input.password else "🙈"
     
     def on_password_change(self, instance, value):
-        Clock.unschedule(self.analyze_password)
-        Clock.schedule_once(lambda dt: self.analyze_password(value), 0.3)
+        if self._analyze_event is not None:
+            self._analyze_event.cancel()
+        self._analyze_event = Clock.schedule_once(lambda dt: self.analyze_password(value), 0.3)
     
     def analyze_password(self, password):
         if not password:
             self.reset_display()
             return
         
-        entropy = calculate_entropy(password)
-        strength = get_strength(entropy, password)
-        feedback_list, score = get_detailed_feedback(password, entropy)
-        
-        # Update strength with animation
-        if strength != self.current_strength:
-            self.animate_strength_change(strength, entropy, score)
-            self.current_strength = strength
-        
-        # Update labels
-        self.strength_label.text = f"Password Strength: {strength}"
-        self.entropy_label.text = f"{entropy} bits"
-        self.time_label.text = f"Time to crack: {time_to_crack(entropy)}"
-        self.score_label.text = f"Score: {score}/8"
-        self.feedback_label.text = "\n".join(feedback_list)
-        self.feedback_label.text_size = (Window.width - dp(80), None)
+        state = build_display_state(password)
+        state['feedback_width'] = Window.width - dp(80)
+        self.apply_display_state(state, animate=True)
     
-    def animate_strength_change(self, strength, entropy, score):
-        # Color mapping
-        colors = {
-            "Very Weak": "#ef4444",
-            "Weak": "#f97316", 
-            "Fair": "#eab308",
-            "Good": "#22c55e",
-            "Strong": "#16a34a",
-            "Very Strong": "#15803d"
-        }
-        
-        # Progress mapping
-        progress_values = {
-            "Very Weak": 15,
-            "Weak": 30,
-            "Fair": 50, 
-            "Good": 70,
-            "Strong": 85,
-            "Very Strong": 100
-        }
-        
-        color = colors.get(strength, "#64748b")
-        progress = progress_values.get(strength, 0)
-        
-        # Animate progress bar
-        anim = Animation(value=progress, duration=0.5, t='out_cubic')
-        anim.start(self.progress)
+    def apply_display_state(self, state, animate):
+        changed = self.view_model.changes(state)
+        
+        if 'strength_text' in changed:
+            self.strength_label.text = changed['strength_text']
+        if 'strength_color' in changed:
+            self.strength_label.color = get_color_from_hex(changed['strength_color'])
+        if 'entropy_text' in changed:
+            self.entropy_label.text = changed['entropy_text']
+        if 'time_text' in changed:
+            self.time_label.text = changed['time_text']
+        if 'score_text' in changed:
+            self.score_label.text = changed['score_text']
+        if 'feedback_width' in changed:
+            self.feedback_label.text_size = (changed['feedback_width'], None)
+        if 'feedback_text' in changed:
+            self.feedback_label.text = changed['feedback_text']
+        if 'progress' in changed:
+            self.animate_progress(changed['progress'], animate)
+    
+    def animate_progress(self, value, animate):
+        # Coalesce with any animation still in flight instead of stacking a new one
+        if self._progress_anim is not None:
+            self._progress_anim.cancel(self.progress)
+            self._progress_anim = None
+        
+        if not animate:
+            self.progress.value = value
+            return
         
-        # Update colors
-        self.strength_label.color = get_color_from_hex(color)
+        self._progress_anim = Animation(value=value, duration=0.5, t='out_cubic')
+        self._progress_anim.start(self.progress)
     
     def reset_display(self):
-        self.strength_label.text = "Password Strength: Not Analyzed"
-        self.strength_label.color = get_color_from_hex("#2d3748")
-        self.entropy_label.text = ""
-        self.progress.value = 0
-        self.time_label.text = "Time to crack: Not calculated"
-        self.score_label.text = "Score: 0/8"
-        self.feedback_label.text = "Enter a password to see detailed security analysis and recommendations..."
-        self.current_strength = ""
+        self.apply_display_state(build_display_state(""), animate=False)
     
     def show_generated_password(self, instance):
-        length = int(self.length_slider.value)
-        use_symbols = self.symbols_switch.active
-        exclude_ambiguous = self.ambiguous_switch.active
-        
-        new_password = generate_secure_password(length, use_symbols, exclude_ambiguous)
+        settings = self.generator_settings()
+        candidate = self.prefetcher.take(settings)
         
         # Create professional popup
         popup_layout = BoxLayout(orientation='vertical', padding=dp(25), spacing=dp(20))
@@ -827,7 +1085,7 @@ class EnhancedPasswordChecker(BoxLayout):
         password_label.bind(size=password_label.setter('text_size'))
         
         password_input = TextInput(
-            text=new_password,
+            text=candidate['password'],
             readonly=True,
             font_size=sp(16),
             multiline=False,
@@ -842,21 +1100,18 @@ class EnhancedPasswordChecker(BoxLayout):
         password_card.add_widget(password_layout)
         
         # Quick analysis
-        quick_entropy = calculate_entropy(new_password)
-        quick_strength = get_strength(quick_entropy, new_password)
-        
         analysis_card = ModernCard(size_hint=(1, None), height=dp(80))
         analysis_layout = BoxLayout(orientation='horizontal', spacing=dp(20))
         
         strength_info = BoxLayout(orientation='vertical', size_hint=(0.5, 1))
         strength_info.add_widget(Label(
-            text=f"Strength: {quick_strength}",
+            text=candidate['strength_text'],
             font_size=sp(14),
             color=get_color_from_hex("#2d3748"),
             halign='center'
         ))
         strength_info.add_widget(Label(
-            text=f"Entropy: {quick_entropy} bits",
+            text=candidate['entropy_text'],
             font_size=sp(12),
             color=get_color_from_hex("#718096"),
             halign='center'
@@ -870,7 +1125,7 @@ class EnhancedPasswordChecker(BoxLayout):
             halign='center'
         ))
         crack_info.add_widget(Label(
-            text=time_to_crack(quick_entropy),
+            text=candidate['time_text'],
             font_size=sp(12),
             color=get_color_from_hex("#718096"),
             halign='center'
@@ -942,18 +1197,16 @@ class EnhancedPasswordChecker(BoxLayout):
                 Clock.schedule_once(lambda dt: setattr(copy_btn, 'text', '📋 Copy Password'), 2)
         
         def use_password(_):
-            self.input.text = new_password
+            self.input.text = password_input.text
             popup.dismiss()
         
         def regenerate_password(_):
-            new_pass = generate_secure_password(length, use_symbols, exclude_ambiguous)
-            password_input.text = new_pass
+            new_candidate = self.prefetcher.take(settings)
+            password_input.text = new_candidate['password']
             # Update analysis
-            new_entropy = calculate_entropy(new_pass)
-            new_strength = get_strength(new_entropy, new_pass)
-            strength_info.children[1].text = f"Strength: {new_strength}"
-            strength_info.children[0].text = f"Entropy: {new_entropy} bits"
-            crack_info.children[0].text = time_to_crack(new_entropy)
+            strength_info.children[1].text = new_candidate['strength_text']
+            strength_info.children[0].text = new_candidate['entropy_text']
+            crack_info.children[0].text = new_candidate['time_text']
         
         def close_popup(_):
             popup.dismiss()
@@ -970,15 +1223,25 @@ class PasswordGuardianApp(App):
         self.title = "Password Guardian Pro"
         self.icon = "icon.png"  # Add your app icon
         
+        if os.path.exists(DICTIONARY_PATH):
+            load_word_dictionary(DICTIONARY_PATH)
+        if os.path.exists(COMMON_PASSWORDS_PATH):
+            bloom_path = COMMON_PASSWORDS_BLOOM_PATH if os.path.exists(COMMON_PASSWORDS_BLOOM_PATH) else None
+            load_common_passwords(COMMON_PASSWORDS_PATH, bloom_path)
+        if os.path.exists(HASH_RATES_PATH):
+            load_hash_rates(HASH_RATES_PATH)
+        
         # Screen manager
         sm = ScreenManager()
         
         # Add screens
         loading_screen = LoadingScreen(name='loading')
         main_screen = MainScreen(name='main')
+        results_screen = ResultsBrowserScreen(name='results')
         
         sm.add_widget(loading_screen)
         sm.add_widget(main_screen)
+        sm.add_widget(results_screen)
         
         return sm
     
@@ -0,0 +1,177 @@
+import bisect, os, threading, time, weakref
+
+# Prometheus text exposition for the scoring engine. Each thread writes to its
+# own shard without locking; shards are only combined when exporting, or when
+# their thread ends and the shard is folded into the merged totals.
+# Collection is off until enabled, so scoring pays only a flag check when
+# nobody exports metrics.
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+METRICS = {
+    'password_analyses_total': ('counter', "Passwords analysed"),
+    'password_strength_total': ('counter', "Analysed passwords by strength bucket"),
+    'password_analyzer_duration_seconds': ('histogram', "Time spent in each analyzer"),
+    'password_dictionary_lookups_total': ('counter', "Dictionary lookups by dictionary"),
+    'password_dictionary_hits_total': ('counter', "Dictionary lookups that matched"),
+    'password_cache_requests_total': ('counter', "Result cache lookups by outcome"),
+}
+
+class _Shard:
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+class _ShardOwner:
+    # Lives only in a thread's local storage, so it is freed when the thread ends
+    __slots__ = ('__weakref__',)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._shards = []
+        self._merged = _Shard()
+        self.enabled = False
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            owner = self._local.owner = _ShardOwner()
+            weakref.finalize(owner, self._retire, shard).atexit = False
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _retire(self, shard):
+        with self._lock:
+            # Gone already if the registry was reset by a fork since
+            if any(existing is shard for existing in self._shards):
+                self._shards = [existing for existing in self._shards if existing is not shard]
+                _fold(self._merged.counters, self._merged.histograms, shard.counters, shard.histograms)
+
+    def inc(self, name, labels=(), amount=1):
+        if not self.enabled:
+            return
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, value, labels=()):
+        if not self.enabled:
+            return
+        histograms = self._shard().histograms
+        key = (name, labels)
+        entry = histograms.get(key)
+        if entry is None:
+            entry = histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def timer(self, analyzer):
+        return _Timer(self, analyzer)
+
+    def snapshot(self):
+        # Plain dicts, so worker processes can pickle them back to the parent
+        counters = {}
+        histograms = {}
+        # Under the lock, so a shard retired meanwhile is not counted twice
+        with self._lock:
+            for shard in self._shards + [self._merged]:
+                _fold(counters, histograms, dict(shard.counters),
+                      {key: [list(entry[0]), entry[1], entry[2]] for key, entry in dict(shard.histograms).items()})
+        return {'counters': counters, 'histograms': histograms}
+
+    def drain(self):
+        # Snapshot and reset, for pool workers that send partial metrics back with each chunk
+        snapshot = self.snapshot()
+        self.reset()
+        return snapshot
+
+    def merge(self, snapshot):
+        with self._lock:
+            _fold(self._merged.counters, self._merged.histograms,
+                  snapshot['counters'], snapshot['histograms'])
+
+    def reset(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.counters.clear()
+                shard.histograms.clear()
+            self._merged = _Shard()
+
+    def _after_fork(self):
+        # A forked worker starts empty instead of re-reporting the parent's counts
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._shards = []
+        self._merged = _Shard()
+
+    def render(self):
+        snapshot = self.snapshot()
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'counter':
+                for (metric, labels), value in sorted(snapshot['counters'].items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {value}")
+                continue
+
+            for (metric, labels), (buckets, total, count) in sorted(snapshot['histograms'].items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket in zip(LATENCY_BUCKETS, buckets):
+                    cumulative += bucket
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {total}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+
+class _Timer:
+    __slots__ = ('registry', 'labels', 'start')
+
+    def __init__(self, registry, analyzer):
+        self.registry = registry
+        self.labels = (('analyzer', analyzer),)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe('password_analyzer_duration_seconds', time.perf_counter() - self.start, self.labels)
+
+def _fold(counters, histograms, new_counters, new_histograms):
+    for key, value in new_counters.items():
+        counters[key] = counters.get(key, 0) + value
+    for key, (buckets, total, count) in new_histograms.items():
+        entry = histograms.get(key)
+        if entry is None:
+            histograms[key] = [list(buckets), total, count]
+        else:
+            entry[0] = [a + b for a, b in zip(entry[0], buckets)]
+            entry[1] += total
+            entry[2] += count
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+REGISTRY = MetricsRegistry()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=REGISTRY._after_fork)
@@ -0,0 +1,450 @@
+import math, string, re
+import hashlib
+from word_trie import WordTrie
+from wordlist_artifacts import CompiledWordList
+from metrics import REGISTRY as METRICS
+
+# Common passwords list (top 100 most common)
+COMMON_PASSWORDS = {
+    '123456', 'password', '123456789', '12345678', '12345', '1234567', '1234567890',
+    'qwerty', 'abc123', 'million', '000000', '1234', 'iloveyou', 'aaron431',
+    'password1', 'qqww1122', '123', 'omgpop', '123321', '654321', 'qwertyuiop',
+    'qwer123456', '123654', '123abc', 'password123', '111111', 'monkey', '11111111',
+    'dragon', 'login', 'princess', 'qwerty123', 'solo', 'passw0rd', 'starwars',
+    'charlie', 'aa123456', '1q2w3e4r', '123qwe', 'zxcvbnm', 'asdf', 'football',
+    'asdfgh', 'master', 'michael', 'superman', 'iloveyou1', 'qwertyui', 'welcome',
+    'monkey1', 'sunshine', 'password12', '123456a', 'admin', 'letmein'
+}
+
+# Bump whenever scoring rules change so cached results are invalidated
+ENGINE_VERSION = "2.2.0"
+
+# Compiled common-password list (see wordlist_compiler.py); replaces COMMON_PASSWORDS once loaded
+COMMON_PASSWORD_LIST = None
+
+def load_common_passwords(path, bloom_path=None):
+    global COMMON_PASSWORD_LIST
+    COMMON_PASSWORD_LIST = CompiledWordList(path, bloom_path)
+    return COMMON_PASSWORD_LIST
+
+# Optional compiled dictionary (see word_trie.py) for words hidden inside passwords
+WORD_DICTIONARY = None
+
+def load_word_dictionary(path):
+    global WORD_DICTIONARY
+    WORD_DICTIONARY = WordTrie(path)
+    return WORD_DICTIONARY
+
+def find_dictionary_words(password):
+    if WORD_DICTIONARY is None:
+        return []
+    words = WORD_DICTIONARY.cover(password.lower())
+    METRICS.inc('password_dictionary_lookups_total', (('dictionary', 'words'),))
+    if words:
+        METRICS.inc('password_dictionary_hits_total', (('dictionary', 'words'),))
+    return words
+
+def is_common_password(password):
+    common = password.lower() in (COMMON_PASSWORDS if COMMON_PASSWORD_LIST is None else COMMON_PASSWORD_LIST)
+    METRICS.inc('password_dictionary_lookups_total', (('dictionary', 'common'),))
+    if common:
+        METRICS.inc('password_dictionary_hits_total', (('dictionary', 'common'),))
+    return common
+
+# Attacker guess rate for crack-time estimates; a calibrated profile (see
+# hash_calibration.py) replaces the default once loaded
+GUESSES_PER_SEC = 1e12
+HASH_RATE_PROFILE = None
+
+def load_hash_rates(path, algorithm=None):
+    from hash_calibration import load_profile, profile_rate
+    
+    global GUESSES_PER_SEC, HASH_RATE_PROFILE
+    profile = load_profile(path)
+    GUESSES_PER_SEC = profile_rate(profile, algorithm)
+    HASH_RATE_PROFILE = profile
+    return profile
+
+# -------- RESULT RECORDS --------
+STRENGTHS = ("Very Weak", "Weak", "Fair", "Good", "Strong", "Very Strong")
+STRENGTH_INDEX = {strength: index for index, strength in enumerate(STRENGTHS)}
+
+# Every feedback message has a bit; results carry the bits they produced and
+# are only rendered to text when shown. Bits follow declaration order, which
+# is also the order feedback is displayed in.
+FEEDBACK_MESSAGES = []
+FEEDBACK_BITS = {}
+FEEDBACK_FAILURES = 0
+
+def feedback_bit(message):
+    global FEEDBACK_FAILURES
+    bit = FEEDBACK_BITS.get(message)
+    if bit is None:
+        bit = FEEDBACK_BITS[message] = 1 << len(FEEDBACK_MESSAGES)
+        FEEDBACK_MESSAGES.append(message)
+        if not message.startswith("✅"):
+            FEEDBACK_FAILURES |= bit
+    return bit
+
+def feedback_messages(codes):
+    messages = []
+    while codes:
+        lowest = codes & -codes
+        messages.append(FEEDBACK_MESSAGES[lowest.bit_length() - 1])
+        codes ^= lowest
+    return messages
+
+class Result:
+    # What bulk paths keep per password: strength is an index into STRENGTHS
+    # and feedback_codes a bitmask of feedback_bit() values
+    __slots__ = ('entropy', 'strength', 'score', 'feedback_codes', 'decided_by')
+    
+    def __init__(self, entropy, strength, score, feedback_codes, decided_by=None):
+        self.entropy = entropy
+        self.strength = strength
+        self.score = score
+        self.feedback_codes = feedback_codes
+        self.decided_by = decided_by
+    
+    @property
+    def strength_name(self):
+        return STRENGTHS[self.strength]
+    
+    def feedback(self):
+        return feedback_messages(self.feedback_codes)
+    
+    def to_dict(self):
+        result = {
+            'entropy': self.entropy,
+            'strength': STRENGTHS[self.strength],
+            'score': self.score,
+            'feedback': feedback_messages(self.feedback_codes),
+        }
+        if self.decided_by is not None:
+            result['decided_by'] = self.decided_by
+        return result
+    
+    def to_list(self):
+        return [self.entropy, self.strength, self.score, self.feedback_codes, self.decided_by]
+    
+    @classmethod
+    def from_list(cls, values):
+        return cls(*values)
+
+# -------- ANALYZER PIPELINE --------
+class Analysis:
+    def __init__(self, password):
+        self.password = password
+        self.lowered = password.lower()
+        self.char_sets = 0
+        self.entropy_factor = 1.0
+        self.feedback_codes = 0
+        self.points = 0
+        self.strength = None
+        self.decided_by = None
+        self.complete = False
+        self._words = None
+    
+    @property
+    def words(self):
+        if self._words is None:
+            self._words = find_dictionary_words(self.password)
+        return self._words
+    
+    def decide(self, strength, analyzer):
+        # The weakest verdict wins, whichever analyzer happened to run first
+        if self.strength is None or STRENGTH_INDEX[strength] < STRENGTH_INDEX[self.strength]:
+            self.strength = strength
+            self.decided_by = analyzer
+    
+    @property
+    def entropy(self):
+        if not self.complete:
+            return None
+        L = len(self.password)
+        N = self.char_sets if self.char_sets > 0 else 1
+        
+        entropy = L * math.log2(N)
+        # A dictionary word costs an attacker one guess from the wordlist, not one per character
+        for start, end in self.words:
+            word_bits = math.log2(max(WORD_DICTIONARY.word_count, 2))
+            entropy -= max((end - start) * math.log2(N) - word_bits, 0)
+        entropy *= self.entropy_factor
+        
+        return round(entropy, 2)
+    
+    @property
+    def score(self):
+        return self.points if self.complete else None
+    
+    def feedback_list(self):
+        # Declaration order, however the analyzers were scheduled
+        return feedback_messages(self.feedback_codes)
+
+class Analyzer:
+    # check(analysis) returns (message, points) pairs and may adjust the
+    # analysis; decisive analyzers cap the strength at `decides`, which never
+    # rates a password above its entropy. Every message check can return must be listed in
+    # messages, so feedback codes are fixed before any password is scored
+    # and agree across worker processes and cached results.
+    def __init__(self, name, check, cost, messages, decisive=False, fingerprint=None, decides="Very Weak"):
+        if not messages:
+            raise ValueError(f"Analyzer {name} declares no feedback messages")
+        if decides not in STRENGTH_INDEX:
+            raise ValueError(f"Unknown strength: {decides}")
+        self.name = name
+        self.check = check
+        self.cost = cost
+        self.decisive = decisive
+        self.decides = decides
+        self.fingerprint = fingerprint or name
+        for message in messages:
+            feedback_bit(message)
+
+ANALYZERS = []
+_schedule = ()
+
+def _reschedule():
+    global _schedule
+    _schedule = tuple(sorted(ANALYZERS, key=lambda a: a.cost))
+
+def register_analyzer(analyzer):
+    unregister_analyzer(analyzer.name)
+    ANALYZERS.append(analyzer)
+    _reschedule()
+    return analyzer
+
+def unregister_analyzer(name):
+    ANALYZERS[:] = [analyzer for analyzer in ANALYZERS if analyzer.name != name]
+    _reschedule()
+
+def _settled(analysis):
+    # Only the weakest strength is final before entropy is known; any other
+    # decided strength is a cap the entropy may still undercut
+    return analysis.strength == STRENGTHS[0]
+
+def capped_strength(decided, entropy_strength):
+    # A decisive verdict can lower a rating, never raise it
+    if decided is None or STRENGTH_INDEX[entropy_strength] < STRENGTH_INDEX[decided]:
+        return entropy_strength
+    return decided
+
+def run_analyzers(password, early_exit=False):
+    # Cheapest first; with early_exit, stop once the strength is settled
+    analysis = Analysis(password)
+    timed = METRICS.enabled
+    for analyzer in _schedule:
+        if timed:
+            with METRICS.timer(analyzer.name):
+                findings = analyzer.check(analysis)
+        else:
+            findings = analyzer.check(analysis)
+        for message, points in findings:
+            bit = FEEDBACK_BITS.get(message)
+            if bit is None:
+                raise ValueError(f"Analyzer {analyzer.name} returned undeclared feedback: {message}")
+            analysis.feedback_codes |= bit
+            analysis.points += points
+        if early_exit and _settled(analysis):
+            return analysis
+    analysis.complete = True
+    return analysis
+
+def decided_strength(password):
+    analysis = Analysis(password)
+    for analyzer in _schedule:
+        if analyzer.decisive:
+            analyzer.check(analysis)
+            if _settled(analysis):
+                break
+    return analysis.strength
+
+def word_list_analyzer(name, words, message, cost=5, strength="Very Weak"):
+    # Deployment-specific list (company names, products...) found anywhere in the
+    # password; a match rates it at most `strength`
+    words = sorted({word.lower() for word in words if word}, key=len, reverse=True)
+    if not words:
+        raise ValueError("word list is empty")
+    if strength not in STRENGTH_INDEX:
+        raise ValueError(f"Unknown strength: {strength}")
+    pattern = re.compile('|'.join(re.escape(word) for word in words))
+    
+    def check(analysis):
+        if pattern.search(analysis.lowered):
+            analysis.decide(strength, name)
+            return [(message, 0)]
+        return []
+    
+    fingerprint = hashlib.sha256('\0'.join([name, strength] + words).encode()).hexdigest()
+    return Analyzer(name, check, cost, decisive=True, fingerprint=fingerprint, messages=(message,), decides=strength)
+
+def check_length(analysis):
+    if len(analysis.password) < 8:
+        return [("❌ Too short (minimum 8 characters)", 0)]
+    elif len(analysis.password) < 12:
+        return [("⚠️ Consider longer password (12+ chars)", 1)]
+    else:
+        return [("✅ Good length", 2)]
+
+# Character class of every ASCII byte (0 for none), agreeing with the str tests below
+LOWER_CLASS, UPPER_CLASS, DIGIT_CLASS, SYMBOL_CLASS = 1, 2, 4, 8
+ASCII_CLASSES = bytes(
+    (LOWER_CLASS if c.islower() else UPPER_CLASS if c.isupper() else DIGIT_CLASS if c.isdigit()
+     else SYMBOL_CLASS if c in string.punctuation else 0) if c.isascii() else 0
+    for c in map(chr, range(256))
+)
+
+def check_character_classes(analysis):
+    password = analysis.password
+    if password.isascii():
+        # One C-level table lookup per byte instead of four passes of str methods
+        classes = password.encode('ascii').translate(ASCII_CLASSES)
+        has_lower = LOWER_CLASS in classes
+        has_upper = UPPER_CLASS in classes
+        has_digit = DIGIT_CLASS in classes
+        has_symbol = SYMBOL_CLASS in classes
+    else:
+        has_lower = any(c.islower() for c in password)
+        has_upper = any(c.isupper() for c in password)
+        has_digit = any(c.isdigit() for c in password)
+        has_symbol = any(c in string.punctuation for c in password)
+    analysis.char_sets = 26 * has_lower + 26 * has_upper + 10 * has_digit + 32 * has_symbol
+    
+    return [
+        ("✅ Contains uppercase", 1) if has_upper else ("❌ Add uppercase letters", 0),
+        ("✅ Contains lowercase", 1) if has_lower else ("❌ Add lowercase letters", 0),
+        ("✅ Contains numbers", 1) if has_digit else ("❌ Add numbers", 0),
+        ("✅ Contains symbols", 1) if has_symbol else ("❌ Add special characters", 0),
+    ]
+
+def check_patterns(analysis):
+    if has_common_sequences(analysis.password) or analysis.words:
+        analysis.entropy_factor *= 0.7
+        return [("⚠️ Avoid common patterns", 0)]
+    return [("✅ No obvious patterns", 1)]
+
+def check_common_password(analysis):
+    if is_common_password(analysis.password):
+        analysis.entropy_factor *= 0.3
+        analysis.decide("Very Weak", 'common_password')
+        return [("❌ This is a common password!", 0)]
+    return [("✅ Not a common password", 1)]
+
+# Registration order is the order feedback is shown in
+register_analyzer(Analyzer('length', check_length, cost=1, messages=(
+    "❌ Too short (minimum 8 characters)", "⚠️ Consider longer password (12+ chars)", "✅ Good length"
+)))
+register_analyzer(Analyzer('character_classes', check_character_classes, cost=4, messages=(
+    "✅ Contains uppercase", "❌ Add uppercase letters", "✅ Contains lowercase", "❌ Add lowercase letters",
+    "✅ Contains numbers", "❌ Add numbers", "✅ Contains symbols", "❌ Add special characters"
+)))
+register_analyzer(Analyzer('patterns', check_patterns, cost=8, messages=(
+    "⚠️ Avoid common patterns", "✅ No obvious patterns"
+)))
+register_analyzer(Analyzer('common_password', check_common_password, cost=2, decisive=True, messages=(
+    "❌ This is a common password!", "✅ Not a common password"
+)))
+
+# -------- PASSWORD LOGIC --------
+def calculate_entropy(password):
+    return run_analyzers(password).entropy
+
+# Sequences flagged by has_common_patterns, matched against the lowercased password
+COMMON_SEQUENCES = (
+    '012|123|234|345|456|567|678|789|890',
+    'abc|bcd|cde|def|efg|fgh|ghi|hij|ijk|jkl|klm|lmn|mno|nop|opq|pqr|qrs|rst|stu|tuv|uvw|vwx|wxy|xyz',
+    'qwe|wer|ert|rty|tyu|yui|uio|iop|asd|sdf|dfg|fgh|ghj|hjk|jkl|zxc|xcv|cvb|vbn|bnm',
+)
+
+def has_common_sequences(password):
+    patterns = [r'(.)\1{2,}'] + [f'({sequences})' for sequences in COMMON_SEQUENCES]
+    return any(re.search(pattern, password.lower()) for pattern in patterns)
+
+def has_common_patterns(password):
+    return has_common_sequences(password) or bool(find_dictionary_words(password))
+
+def strength_for_entropy(entropy):
+    if entropy < 30:
+        return "Weak"
+    elif entropy < 50:
+        return "Fair"
+    elif entropy < 70:
+        return "Good"
+    elif entropy < 90:
+        return "Strong"
+    else:
+        return "Very Strong"
+
+def get_strength(entropy, password):
+    return capped_strength(decided_strength(password), strength_for_entropy(entropy))
+
+def get_detailed_feedback(password, entropy):
+    analysis = run_analyzers(password)
+    return analysis.feedback_list(), analysis.score
+
+def generate_secure_password(length=16, use_symbols=True, exclude_ambiguous=True):
+    from constrained_generator import PasswordPolicy, DEFAULT_SYMBOLS, generate_password
+    
+    policy = PasswordPolicy(
+        length,
+        min_symbols=1 if use_symbols else 0,
+        symbols=DEFAULT_SYMBOLS if use_symbols else "",
+        banned="0O1lI" if exclude_ambiguous else ""
+    )
+    return generate_password(policy)
+
+def time_to_crack(entropy, guesses_per_sec=None):
+    guesses_per_sec = guesses_per_sec or GUESSES_PER_SEC
+    seconds = (2 ** entropy) / (2 * guesses_per_sec)
+    
+    if seconds < 1:
+        return "Instantly"
+    elif seconds < 60:
+        return f"{seconds:.1f} seconds"
+    elif seconds < 3600:
+        return f"{seconds/60:.1f} minutes"
+    elif seconds < 86400:
+        return f"{seconds/3600:.1f} hours"
+    elif seconds < 31536000:
+        return f"{seconds/86400:.1f} days"
+    elif seconds < 31536000000:
+        return f"{seconds/31536000:.1f} years"
+    else:
+        return "Millions of years"
+
+def analyze_record(password, early_exit=False):
+    # With early_exit a "Very Weak" verdict skips the remaining analyzers, so its
+    # entropy and score are None and feedback covers only what ran
+    analysis = run_analyzers(password, early_exit)
+    entropy = analysis.entropy
+    decided_by = analysis.decided_by
+    if analysis.complete:
+        strength = capped_strength(analysis.strength, strength_for_entropy(entropy))
+        if strength != analysis.strength:
+            decided_by = None
+    else:
+        strength = analysis.strength
+    
+    METRICS.inc('password_analyses_total')
+    METRICS.inc('password_strength_total', (('strength', strength),))
+    return Result(entropy, STRENGTH_INDEX[strength], analysis.score, analysis.feedback_codes, decided_by)
+
+def analyze(password, early_exit=False):
+    return analyze_record(password, early_exit).to_dict()
+
+def engine_fingerprint(early_exit=False):
+    # Identifies the scoring engine plus every analyzer and dictionary it consults
+    digest = hashlib.sha256(ENGINE_VERSION.encode())
+    digest.update(b'early-exit' if early_exit else b'full')
+    for analyzer in ANALYZERS:
+        digest.update(b'\0' + analyzer.fingerprint.encode())
+    # Cached results store feedback codes, which are only meaningful with the same messages
+    digest.update(b'\1' + '\0'.join(FEEDBACK_MESSAGES).encode())
+    if COMMON_PASSWORD_LIST is None:
+        for word in sorted(COMMON_PASSWORDS):
+            digest.update(b'\0' + word.encode())
+    else:
+        digest.update(COMMON_PASSWORD_LIST.checksum)
+    if WORD_DICTIONARY is not None:
+        digest.update(WORD_DICTIONARY.checksum)
+    return digest.digest()
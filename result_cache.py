@@ -0,0 +1,232 @@
+import hashlib, hmac, json, mmap, os, struct
+
+from password_logic import engine_fingerprint
+from metrics import REGISTRY as METRICS
+
+# Two generation files, PATH (current) and PATH.prev, each holding a header,
+# an open-addressing hash table and append-only records of (key, payload
+# length, payload). Lookups probe the table through mmap, so opening a cache
+# costs nothing per entry. When the current generation is full it becomes
+# the previous one and the old previous one is deleted; hits in the previous
+# generation are copied forward, so entries still in use survive.
+CACHE_MAGIC = b'PGRC'
+CACHE_FORMAT = 2
+# magic, format, fingerprint, table slots, entries, end of the records
+HEADER = struct.Struct('<4sB32sIIQ')
+# The part of the header rewritten after each record
+COUNTS = struct.Struct('<IQ')
+# key tag, record offset (0 for an empty slot)
+SLOT = struct.Struct('<II')
+RECORD = struct.Struct('<32sI')
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+MIN_MAX_BYTES = 64 * 1024
+# Table slots per byte of generation; records are at least ~60 bytes, so the
+# table stays under half full
+SLOT_DENSITY = 32
+# Offsets in the table are 32-bit
+MAX_GENERATION_BYTES = (1 << 32) - 1
+GROWTH_STEP = 1 << 20
+
+def load_secret(path):
+    try:
+        with open(path, 'rb') as f:
+            secret = f.read()
+        if len(secret) >= 32:
+            return secret
+    except FileNotFoundError:
+        pass
+
+    secret = os.urandom(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(secret)
+    return secret
+
+class _Generation:
+    # One cache file, mapped read-write and grown in steps up to its limit
+    def __init__(self, path, fingerprint, limit, create=False):
+        self.path = path
+        self.limit = limit
+        self._map = None
+        if create or not self._open(fingerprint):
+            self._create(fingerprint)
+
+    def _open(self, fingerprint):
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return False
+        if size < HEADER.size:
+            return False
+        self._mapfile()
+        magic, version, stored, self.slots, self.entries, self.end = HEADER.unpack_from(self._map, 0)
+        self.table_end = HEADER.size + self.slots * SLOT.size
+        if (magic, version, stored) != (CACHE_MAGIC, CACHE_FORMAT, fingerprint) or not \
+                self.table_end <= self.end <= size:
+            # Written by another engine or dictionary version, or damaged
+            self.close()
+            return False
+        return True
+
+    def _create(self, fingerprint):
+        self.close()
+        self.slots = max(64, self.limit // SLOT_DENSITY)
+        self.entries = 0
+        self.table_end = self.end = HEADER.size + self.slots * SLOT.size
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(CACHE_MAGIC, CACHE_FORMAT, fingerprint, self.slots, 0, self.end))
+            f.truncate(min(self.end + GROWTH_STEP, self.limit))
+        self._mapfile()
+
+    def _mapfile(self):
+        self.close()
+        with open(self.path, 'r+b') as f:
+            self._map = mmap.mmap(f.fileno(), 0)
+
+    def close(self):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+
+    def _probe(self, key):
+        # Slot position holding key, or the empty one where it would go
+        tag = int.from_bytes(key[:4], 'little')
+        position = int.from_bytes(key[4:12], 'little') % self.slots
+        view = self._map
+        while True:
+            slot = HEADER.size + position * SLOT.size
+            slot_tag, offset = SLOT.unpack_from(view, slot)
+            if offset == 0:
+                return slot, 0
+            # A record torn by an interrupted run may have been overwritten; the key check catches it
+            if slot_tag == tag and offset + RECORD.size <= self.end and view[offset:offset + 32] == key:
+                return slot, offset
+            position = (position + 1) % self.slots
+
+    def get(self, key):
+        _, offset = self._probe(key)
+        if offset == 0:
+            return None
+        _, length = RECORD.unpack_from(self._map, offset)
+        start = offset + RECORD.size
+        if start + length > self.end:
+            return None
+        return self._map[start:start + length]
+
+    def fits(self, payload):
+        return (self.end + RECORD.size + len(payload) <= self.limit and
+                (self.entries + 1) * 2 <= self.slots)
+
+    def put(self, key, payload):
+        slot, offset = self._probe(key)
+        if offset:
+            return
+        offset = self.end
+        end = offset + RECORD.size + len(payload)
+        if end > len(self._map):
+            self._grow(end)
+        view = self._map
+        view[offset:offset + RECORD.size] = RECORD.pack(key, len(payload))
+        view[offset + RECORD.size:end] = payload
+        # Record first, then the slot, then the header that makes it count
+        SLOT.pack_into(view, slot, int.from_bytes(key[:4], 'little'), offset)
+        self.entries += 1
+        self.end = end
+        COUNTS.pack_into(view, HEADER.size - COUNTS.size, self.entries, self.end)
+
+    def _grow(self, needed):
+        size = min(max(needed, 2 * len(self._map), len(self._map) + GROWTH_STEP), self.limit)
+        self._map.flush()
+        self._map.close()
+        self._map = None
+        os.truncate(self.path, size)
+        self._mapfile()
+
+    def finish(self):
+        # Give back the unused tail of the last growth step
+        if self._map is not None and len(self._map) > self.end:
+            self.close()
+            os.truncate(self.path, self.end)
+
+class ResultCache:
+    def __init__(self, path, secret=None, max_bytes=DEFAULT_MAX_BYTES, fingerprint=None):
+        self.path = path
+        self.max_bytes = max(max_bytes, MIN_MAX_BYTES)
+        self.secret = secret if secret is not None else load_secret(path + '.key')
+        self.fingerprint = fingerprint or engine_fingerprint()
+        self.hits = 0
+        self.misses = 0
+
+        self._limit = min(self.max_bytes // 2, MAX_GENERATION_BYTES)
+        self._current = _Generation(path, self.fingerprint, self._limit)
+        self._previous = None
+        if os.path.exists(path + '.prev'):
+            previous = _Generation(path + '.prev', self.fingerprint, self._limit)
+            if previous.entries:
+                self._previous = previous
+            else:
+                # Empty, or reset because another fingerprint wrote it
+                previous.close()
+                os.remove(previous.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        # Entries copied forward from the previous generation count twice
+        return self._current.entries + (self._previous.entries if self._previous is not None else 0)
+
+    def key(self, password):
+        message = self.fingerprint + password.encode('utf-8', 'surrogateescape')
+        return hmac.new(self.secret, message, hashlib.sha256).digest()
+
+    def get(self, password):
+        key = self.key(password)
+        payload = self._current.get(key)
+        if payload is None and self._previous is not None:
+            payload = self._previous.get(key)
+            if payload is not None:
+                self._store(key, payload)
+        if payload is None:
+            self.misses += 1
+            METRICS.inc('password_cache_requests_total', (('result', 'miss'),))
+            return None
+        self.hits += 1
+        METRICS.inc('password_cache_requests_total', (('result', 'hit'),))
+        return json.loads(payload)
+
+    def put(self, password, result):
+        payload = json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode()
+        self._store(self.key(password), payload)
+
+    def _store(self, key, payload):
+        if self._current.table_end + RECORD.size + len(payload) > self._limit:
+            # Would not fit even an empty generation
+            return
+        if not self._current.fits(payload):
+            self._rotate()
+        self._current.put(key, payload)
+
+    def _rotate(self):
+        # The current generation becomes the previous one; the older one is dropped
+        if self._previous is not None:
+            self._previous.close()
+        self._current.finish()
+        os.replace(self.path, self.path + '.prev')
+        self._previous = _Generation(self.path + '.prev', self.fingerprint, self._limit)
+        self._current = _Generation(self.path, self.fingerprint, self._limit, create=True)
+
+    def close(self):
+        if self._current is None:
+            return
+        self._current.finish()
+        self._current.close()
+        self._current = None
+        if self._previous is not None:
+            self._previous.close()
+            self._previous = None
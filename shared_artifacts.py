@@ -0,0 +1,90 @@
+import gc, multiprocessing
+from multiprocessing import shared_memory
+
+import password_logic
+from word_trie import WordTrie
+
+# Scoring pools attach the parent's artifacts instead of loading their own copies.
+# File-backed artifacts are mapped read-only, so every worker shares the page
+# cache; artifacts that only exist in memory are copied once into shared memory.
+
+class SharedBlock:
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self._memory = None
+
+    @classmethod
+    def publish(cls, data):
+        memory = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        memory.buf[:len(data)] = data
+        block = cls(memory.name, len(data))
+        block._memory = memory
+        return block
+
+    def __getstate__(self):
+        return {'name': self.name, 'size': self.size}
+
+    def __setstate__(self, state):
+        self.name = state['name']
+        self.size = state['size']
+        self._memory = None
+
+    def attach(self):
+        if self._memory is None:
+            self._memory = shared_memory.SharedMemory(name=self.name)
+        return self._memory.buf[:self.size]
+
+    def release(self, unlink=False):
+        if self._memory is not None:
+            self._memory.close()
+            if unlink:
+                self._memory.unlink()
+            self._memory = None
+
+def export_artifacts():
+    # Picklable handles for everything the current process has loaded
+    artifacts = {}
+    dictionary = password_logic.WORD_DICTIONARY
+    if dictionary is not None:
+        if dictionary.path is not None:
+            artifacts['dictionary'] = ('file', dictionary.path)
+        else:
+            artifacts['dictionary'] = ('shared', SharedBlock.publish(dictionary._map))
+    common = password_logic.COMMON_PASSWORD_LIST
+    if common is not None:
+        artifacts['common_passwords'] = ('file', (common.path, common.bloom_path))
+    return artifacts
+
+def attach_artifacts(artifacts):
+    # Pool initializer: map the artifacts without parsing or copying them
+    kind, source = artifacts.get('dictionary', (None, None))
+    if kind == 'file':
+        if password_logic.WORD_DICTIONARY is None or password_logic.WORD_DICTIONARY.path != source:
+            password_logic.load_word_dictionary(source)
+    elif kind == 'shared':
+        password_logic.WORD_DICTIONARY = WordTrie(buffer=source.attach())
+
+    kind, source = artifacts.get('common_passwords', (None, None))
+    common = password_logic.COMMON_PASSWORD_LIST
+    if kind == 'file' and (common is None or (common.path, common.bloom_path) != source):
+        password_logic.load_common_passwords(*source)
+
+def release_artifacts(artifacts):
+    for kind, source in artifacts.values():
+        if kind == 'shared':
+            source.release(unlink=True)
+
+def scoring_pool(processes=None):
+    # Forked workers inherit the parent's objects (custom analyzers included)
+    # outright; freezing the collector keeps worker GCs from touching, and so
+    # copying, those pages. Spawned workers only get what export_artifacts lists.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    artifacts = export_artifacts()
+    gc.freeze()
+    try:
+        pool = context.Pool(processes, initializer=attach_artifacts, initargs=(artifacts,))
+    finally:
+        gc.unfreeze()
+    return pool, artifacts
@@ -0,0 +1,63 @@
+import asyncio, time
+
+import pytest
+
+from async_analysis import analyze_stream
+from password_logic import analyze
+
+async def produce(items, pulled=None):
+    for item in items:
+        if pulled is not None:
+            pulled.append(item)
+        yield item
+
+def slow_for_early_items(password):
+    # Earlier items finish last, so completion order is the reverse of input order
+    time.sleep(0.02 * (5 - int(password)))
+    return int(password) * 10
+
+def collect(stream):
+    async def run():
+        return [item async for item in stream]
+    return asyncio.run(run())
+
+def test_ordered_keeps_input_order():
+    items = [str(i) for i in range(5)]
+    results = collect(analyze_stream(produce(items), max_workers=5, analyzer=slow_for_early_items))
+    assert results == [(item, int(item) * 10) for item in items]
+
+def test_unordered_yields_in_completion_order():
+    items = [str(i) for i in range(5)]
+    results = collect(analyze_stream(produce(items), ordered=False, max_workers=5, analyzer=slow_for_early_items))
+    assert sorted(results) == [(item, int(item) * 10) for item in items]
+    assert results[0] == ('4', 40)
+
+def test_default_analyzer_scores_passwords():
+    results = collect(analyze_stream(produce(["hunter2", "Tr0ub4dor&3"]), max_workers=2))
+    assert results == [("hunter2", analyze("hunter2")), ("Tr0ub4dor&3", analyze("Tr0ub4dor&3"))]
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_slow_consumer_pauses_the_producer(ordered):
+    pulled = []
+    ahead = []
+
+    async def run():
+        consumed = 0
+        async for _ in analyze_stream(produce([str(i) for i in range(40)], pulled), ordered=ordered,
+                                      max_workers=2, max_pending=3, analyzer=len):
+            consumed += 1
+            ahead.append(len(pulled) - consumed)
+            await asyncio.sleep(0.005)
+        return consumed
+
+    assert asyncio.run(run()) == 40
+    # At most max_pending items in flight, plus the one waiting for a slot
+    assert max(ahead) <= 3 + 1
+
+def test_producer_error_is_raised_to_the_consumer():
+    async def failing():
+        yield "hunter2"
+        raise RuntimeError("export went away")
+
+    with pytest.raises(RuntimeError, match="export went away"):
+        collect(analyze_stream(failing(), max_workers=1, analyzer=len))
@@ -0,0 +1,18 @@
+from audit_sketch import AuditSketch, render_report
+from password_logic import analyze_record
+
+def test_duplicates_count_accounts_beyond_the_first():
+    sketch = AuditSketch(secret=b'k' * 32)
+    shared = analyze_record("hunter2")
+    for _ in range(500):
+        sketch.add("hunter2", shared)
+    for i in range(100):
+        sketch.add(f"unique{i}!", analyze_record(f"unique{i}!"))
+
+    report = sketch.report()
+    assert report['entries'] == 600
+    # entries less the distinct estimate: 499 give or take the HyperLogLog error
+    assert report['duplicate_accounts'] == 600 - report['distinct_passwords']
+    assert abs(report['duplicate_accounts'] - 499) <= 5
+    duplicates = report['duplicate_accounts']
+    assert f"Duplicate accounts beyond the first per password (est.): {duplicates}" in render_report(report)
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+import password_logic
+from bulk_audit import audit_file
+from password_logic import Analyzer, register_analyzer, unregister_analyzer, analyze
+
+ACME_MESSAGE = "⚠️ Mentions the company name"
+
+def check_acme(analysis):
+    if 'acme' in analysis.lowered:
+        return [(ACME_MESSAGE, 0)]
+    return []
+
+@pytest.fixture
+def acme_analyzer():
+    register_analyzer(Analyzer('acme', check_acme, cost=3, messages=(ACME_MESSAGE,)))
+    yield
+    unregister_analyzer('acme')
+
+def test_custom_feedback_survives_worker_pool(tmp_path, acme_analyzer):
+    # Workers must agree with the parent on what each feedback bit means
+    source = tmp_path / 'export.txt'
+    source.write_text(''.join(f"user{i}:AcmeRocks{i}!x\n" for i in range(3000)), encoding='utf-8')
+    output = tmp_path / 'audit.jsonl'
+
+    summary = audit_file(str(source), str(output), separator=':', workers=2, feedback_text=True)
+
+    rows = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert summary['entries'] == len(rows) == 3000
+    assert all(ACME_MESSAGE in row['feedback'] for row in rows)
+    assert all(row['feedback_codes'] & password_logic.FEEDBACK_BITS[ACME_MESSAGE] for row in rows)
+
+def undeclared_check(analysis):
+    return [("not declared", 0)]
+
+def test_undeclared_feedback_fails_in_workers(tmp_path):
+    # A worker must not invent a bit the parent cannot render
+    source = tmp_path / 'export.txt'
+    source.write_text(''.join(f"user{i}:Secret{i}\n" for i in range(3000)), encoding='utf-8')
+    register_analyzer(Analyzer('sneaky', undeclared_check, cost=3, messages=("declared",)))
+    try:
+        with pytest.raises(ValueError, match="undeclared feedback"):
+            audit_file(str(source), str(tmp_path / 'audit.jsonl'), separator=':', workers=2, feedback_text=True)
+    finally:
+        unregister_analyzer('sneaky')
+
+def test_undeclared_feedback_is_rejected():
+    register_analyzer(Analyzer('sneaky', undeclared_check, cost=3, messages=("declared",)))
+    try:
+        with pytest.raises(ValueError, match="undeclared feedback"):
+            analyze("whatever")
+    finally:
+        unregister_analyzer('sneaky')
+
+def test_analyzer_requires_messages():
+    with pytest.raises(ValueError):
+        Analyzer('silent', check_acme, cost=3, messages=())
+
+def test_lines_without_separator_are_skipped_not_echoed(tmp_path):
+    source = tmp_path / 'export.txt'
+    source.write_text("alice:first\nHunter2Secret!\nbob:second\n", encoding='utf-8')
+    output = tmp_path / 'audit.jsonl'
+
+    summary = audit_file(str(source), str(output), separator=':')
+
+    text = output.read_text(encoding='utf-8')
+    assert [json.loads(line)['line'] for line in text.splitlines()] == [1, 3]
+    assert 'Hunter2Secret' not in text
+    assert summary['entries'] == 2
+    assert summary['malformed'] == 1 and summary['malformed_lines'] == [2]
+
+def test_analyzer_name_is_escaped_in_jsonl(tmp_path):
+    name = 'quote"back\\slash'
+    register_analyzer(password_logic.word_list_analyzer(name, ['acme'], ACME_MESSAGE, cost=1))
+    try:
+        source = tmp_path / 'export.txt'
+        source.write_text("acme\n", encoding='utf-8')
+        output = tmp_path / 'audit.jsonl'
+        audit_file(str(source), str(output))
+    finally:
+        unregister_analyzer(name)
+
+    row = json.loads(output.read_text(encoding='utf-8'))
+    assert row['decided_by'] == name
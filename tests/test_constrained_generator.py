@@ -0,0 +1,33 @@
+import itertools
+
+import pytest
+
+from constrained_generator import PasswordPolicy, ConstrainedGenerator, char_class, generator_for
+
+def brute_force_count(policy):
+    banned = policy.banned_substrings()
+    count = 0
+    for candidate in itertools.product(policy.alphabet, repeat=policy.length):
+        password = ''.join(candidate)
+        classes = [char_class(c) for c in password]
+        if any(classes.count(k) < minimum for k, minimum in enumerate(policy.minimums)):
+            continue
+        if not policy.allow_leading_symbol and classes[0] == 3:
+            continue
+        if any(word in password.lower() for word in banned):
+            continue
+        count += 1
+    return count
+
+@pytest.mark.parametrize('policy', [
+    PasswordPolicy(5, 1, 1, 1, 0, allowed="abcAB12", max_repeat=1, avoid_patterns=False),
+    PasswordPolicy(5, 2, 0, 1, 1, allowed="abc 12!", max_repeat=2, avoid_patterns=True),
+    PasswordPolicy(4, 0, 1, 1, 1, allowed="aA1!-", max_repeat=None, avoid_patterns=False, allow_leading_symbol=False),
+])
+def test_count_matches_brute_force(policy):
+    assert ConstrainedGenerator(policy, policy.length).count(policy.length) == brute_force_count(policy)
+
+def test_generator_is_reused_for_shorter_lengths():
+    long = generator_for(PasswordPolicy(24))
+    assert generator_for(PasswordPolicy(12)) is long
+    assert len(generator_for(PasswordPolicy(28)).generate(28)) == 28
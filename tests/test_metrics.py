@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+import password_logic
+from metrics import MetricsRegistry, REGISTRY
+
+def enabled_registry():
+    registry = MetricsRegistry()
+    registry.enabled = True
+    return registry
+
+def test_finished_threads_fold_their_shards():
+    registry = enabled_registry()
+
+    def work():
+        registry.inc('password_analyses_total')
+        registry.observe('password_analyzer_duration_seconds', 0.001, (('analyzer', 'length'),))
+
+    for _ in range(20):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    assert registry._shards == []
+    snapshot = registry.snapshot()
+    assert snapshot['counters'][('password_analyses_total', ())] == 20
+    assert snapshot['histograms'][('password_analyzer_duration_seconds', (('analyzer', 'length'),))][2] == 20
+
+def test_collection_is_opt_in():
+    REGISTRY.reset()
+    password_logic.analyze_record("Tr0ub4dor&3")
+    assert REGISTRY.snapshot() == {'counters': {}, 'histograms': {}}
+
+    REGISTRY.enabled = True
+    try:
+        password_logic.analyze_record("Tr0ub4dor&3")
+    finally:
+        REGISTRY.enabled = False
+    snapshot = REGISTRY.drain()
+    assert snapshot['counters'][('password_analyses_total', ())] == 1
+    assert ('password_analyzer_duration_seconds', (('analyzer', 'length'),)) in snapshot['histograms']
+
+def test_drain_returns_counts_once():
+    registry = enabled_registry()
+    registry.inc('password_dictionary_lookups_total', (('dictionary', 'words'),), 3)
+    registry.observe('password_analyzer_duration_seconds', 0.00002, (('analyzer', 'length'),))
+
+    drained = registry.drain()
+    assert drained['counters'] == {('password_dictionary_lookups_total', (('dictionary', 'words'),)): 3}
+    buckets, total, count = drained['histograms'][('password_analyzer_duration_seconds', (('analyzer', 'length'),))]
+    assert (sum(buckets), count) == (1, 1) and total == pytest.approx(0.00002)
+    assert registry.drain() == {'counters': {}, 'histograms': {}}
+
+def test_merge_adds_worker_snapshots():
+    parent, worker = enabled_registry(), enabled_registry()
+    parent.inc('password_analyses_total', amount=2)
+    for _ in range(2):
+        worker.inc('password_analyses_total', amount=5)
+        worker.observe('password_analyzer_duration_seconds', 0.002, (('analyzer', 'entropy'),))
+        parent.merge(worker.drain())
+
+    snapshot = parent.snapshot()
+    assert snapshot['counters'][('password_analyses_total', ())] == 12
+    buckets, total, count = snapshot['histograms'][('password_analyzer_duration_seconds', (('analyzer', 'entropy'),))]
+    assert count == 2 and sum(buckets) == 2 and total == pytest.approx(0.004)
+
+    rendered = parent.render()
+    assert "password_analyses_total 12" in rendered
+    assert 'password_analyzer_duration_seconds_count{analyzer="entropy"} 2' in rendered
+    assert 'password_analyzer_duration_seconds_bucket{analyzer="entropy",le="+Inf"} 2' in rendered
+
+def test_snapshot_is_a_copy():
+    registry = enabled_registry()
+    registry.inc('password_analyses_total')
+    snapshot = registry.snapshot()
+    registry.inc('password_analyses_total')
+    assert snapshot['counters'][('password_analyses_total', ())] == 1
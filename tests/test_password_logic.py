@@ -0,0 +1,39 @@
+import pytest
+
+from password_logic import (
+    analyze, calculate_entropy, get_strength, register_analyzer, unregister_analyzer, word_list_analyzer
+)
+
+COMPANY_MESSAGE = "⚠️ Mentions the company"
+
+@pytest.fixture
+def company_analyzer():
+    register_analyzer(word_list_analyzer('company', ['acme'], COMPANY_MESSAGE, cost=1, strength='Fair'))
+    yield
+    unregister_analyzer('company')
+
+@pytest.mark.parametrize('early_exit', [False, True])
+def test_decisive_verdict_never_improves_a_rating(company_analyzer, early_exit):
+    result = analyze('acme1', early_exit)
+    assert result['strength'] == 'Weak'
+    assert 'decided_by' not in result
+    assert COMPANY_MESSAGE in result['feedback']
+    assert get_strength(calculate_entropy('acme1'), 'acme1') == 'Weak'
+
+@pytest.mark.parametrize('early_exit', [False, True])
+def test_decisive_verdict_caps_a_strong_password(company_analyzer, early_exit):
+    result = analyze('acmeX9!kq#Lz2@Vw7$Rt', early_exit)
+    assert result['strength'] == 'Fair'
+    assert result['decided_by'] == 'company'
+    assert result['entropy'] is not None
+
+def test_weakest_verdict_wins_over_a_cheaper_cap():
+    # The cheaper cap is decided first; the common password check must still lower it
+    register_analyzer(word_list_analyzer('company', ['pass'], COMPANY_MESSAGE, cost=1, strength='Fair'))
+    try:
+        for early_exit in (False, True):
+            result = analyze('password', early_exit)
+            assert result['strength'] == 'Very Weak'
+            assert result['decided_by'] == 'common_password'
+    finally:
+        unregister_analyzer('company')
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from result_cache import ResultCache, HEADER, COUNTS
+
+RESULT = [41.23, 3, 5, 21681, None]
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'results.cache')
+
+def open_cache(path, fingerprint=b'a' * 32, **kwargs):
+    return ResultCache(path, fingerprint=fingerprint, **kwargs)
+
+def cache_bytes(path):
+    return sum(os.path.getsize(name) for name in (path, path + '.prev') if os.path.exists(name))
+
+def test_hit_and_miss(cache_path):
+    with open_cache(cache_path) as cache:
+        assert cache.get("hunter2") is None
+        cache.put("hunter2", RESULT)
+        assert cache.get("hunter2") == RESULT
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    with open_cache(cache_path) as cache:
+        assert cache.get("hunter2") == RESULT
+        assert cache.get("Hunter2") is None
+        assert len(cache) == 1
+
+def test_other_fingerprint_invalidates(cache_path):
+    with open_cache(cache_path) as cache:
+        cache.put("hunter2", RESULT)
+    with open_cache(cache_path, fingerprint=b'b' * 32) as cache:
+        assert cache.get("hunter2") is None
+        assert len(cache) == 0
+    with open_cache(cache_path) as cache:
+        assert cache.get("hunter2") is None
+
+def test_record_torn_before_its_header_update_is_ignored(cache_path):
+    with open_cache(cache_path) as cache:
+        cache.put("first", RESULT)
+    with open(cache_path, 'rb') as f:
+        counts = f.read(HEADER.size)[-COUNTS.size:]
+    with open_cache(cache_path) as cache:
+        cache.put("second", RESULT)
+    # As if the run stopped after writing the record and its slot
+    with open(cache_path, 'r+b') as f:
+        f.seek(HEADER.size - COUNTS.size)
+        f.write(counts)
+
+    with open_cache(cache_path) as cache:
+        assert cache.get("second") is None
+        cache.put("third", [1.0, 0, 0, 0, None])
+        assert cache.get("first") == RESULT
+        assert cache.get("second") is None
+        assert cache.get("third") == [1.0, 0, 0, 0, None]
+
+def test_truncated_file_starts_over(cache_path):
+    with open_cache(cache_path) as cache:
+        cache.put("hunter2", RESULT)
+    os.truncate(cache_path, os.path.getsize(cache_path) - 10)
+    with open_cache(cache_path) as cache:
+        assert cache.get("hunter2") is None
+        cache.put("hunter2", RESULT)
+        assert cache.get("hunter2") == RESULT
+
+def test_size_limit_holds_during_a_run_and_keeps_used_entries(cache_path):
+    limit = 1 << 20
+    with open_cache(cache_path, max_bytes=limit) as cache:
+        for i in range(30000):
+            cache.put(f"password{i}", RESULT)
+            if i % 100 == 0:
+                assert cache.get("password0") == RESULT
+                assert cache_bytes(cache_path) <= limit
+        assert cache.get(f"password{29999}") == RESULT
+        assert cache.get("password1") is None
+    assert cache_bytes(cache_path) <= limit
+
+    with open_cache(cache_path, max_bytes=limit) as cache:
+        assert cache.get("password0") == RESULT
@@ -0,0 +1,66 @@
+import random
+
+from word_trie import WordTrie, build_trie, build_trie_from_files
+
+def test_undecodable_bytes_are_kept_not_dropped(tmp_path):
+    wordlist = tmp_path / 'words.txt'
+    wordlist.write_bytes(b'caf\xe9\nHello\nhello\n')
+    path = str(tmp_path / 'words.dawg')
+
+    assert build_trie_from_files([str(wordlist)], path, workers=1) == 2
+    trie = WordTrie(path)
+    assert 'caf' not in trie
+    assert 'caf\udce9' in trie
+    assert trie.find_all('xxcafxx') == []
+    assert 'hello' in trie
+    trie.close()
+
+def build(tmp_path, words, **kwargs):
+    path = str(tmp_path / 'test.dawg')
+    build_trie(sorted(word.encode('utf-8') for word in words), path, **kwargs)
+    return WordTrie(path)
+
+WORDS = ['pass', 'password', 'word', 'sword', 'dragon', 'café', 'on']
+
+def test_find_all_reports_every_word_span(tmp_path):
+    trie = build(tmp_path, WORDS)
+    assert sorted(trie.find_all('xpassword1')) == [(1, 5), (1, 9), (4, 9), (5, 9)]
+    # Shorter than MIN_WORD_LENGTH unless asked for
+    assert trie.find_all('on') == []
+    assert trie.find_all('on', min_length=2) == [(0, 2)]
+    trie.close()
+
+def test_spans_are_in_characters_for_multibyte_text(tmp_path):
+    trie = build(tmp_path, WORDS)
+    assert trie.find_all('é!café') == [(2, 6)]
+    assert trie.cover('ßcafédragon') == [(1, 5), (5, 11)]
+    trie.close()
+
+def test_cover_takes_the_longest_word_without_overlaps(tmp_path):
+    trie = build(tmp_path, WORDS)
+    assert trie.cover('password') == [(0, 8)]
+    # sword wins at 2; dragon overlaps it and is skipped
+    assert trie.cover('xxswordragon') == [(2, 7)]
+    trie.close()
+
+def test_capped_register_keeps_lookups(tmp_path):
+    rng = random.Random(7)
+    words = sorted({''.join(rng.choice('abcde') for _ in range(rng.randint(3, 7))) for _ in range(300)})
+    full = build(tmp_path, words)
+    path = str(tmp_path / 'capped.dawg')
+    build_trie((word.encode() for word in words), path, register_limit=4)
+    capped = WordTrie(path)
+    assert capped.node_count > full.node_count
+    for text in ('abcabcdeabba', 'zzddaecc', 'eeeeeddcba'):
+        assert capped.find_all(text) == full.find_all(text)
+    assert all(word in capped for word in words)
+    full.close()
+    capped.close()
+
+def test_reads_from_a_buffer(tmp_path):
+    path = str(tmp_path / 'test.dawg')
+    build_trie(sorted(word.encode('utf-8') for word in WORDS), path)
+    with open(path, 'rb') as f:
+        trie = WordTrie(buffer=f.read())
+    assert 'dragon' in trie and 'drag' not in trie
+    trie.close()
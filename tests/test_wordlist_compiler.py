@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+import password_logic
+from audit_results import AuditResultFile
+from bulk_audit import audit_file
+from wordlist_compiler import compile_wordlists, normalize_entry
+
+@pytest.fixture
+def restore_common_passwords():
+    yield
+    password_logic.COMMON_PASSWORD_LIST = None
+
+def test_normalize_entry_keeps_undecodable_bytes():
+    assert normalize_entry(b'\xe9t\xe9\n') == b'\xe9t\xe9'
+    assert normalize_entry(b'Caf\xc3\xa9\r\n') == 'café'.encode('utf-8')
+    assert normalize_entry(b'\n') is None
+
+def test_non_utf8_entry_matches_the_same_bytes_when_audited(tmp_path, restore_common_passwords):
+    # The compiler and the scorer must encode an entry the same way
+    wordlist = tmp_path / 'list.txt'
+    wordlist.write_bytes(b'password\n\xe9t\xe9\n')
+    compile_wordlists([str(wordlist)], str(tmp_path / 'common'), workers=1, bloom=False, trie=False)
+    password_logic.load_common_passwords(str(tmp_path / 'common.words'))
+
+    source = tmp_path / 'export.txt'
+    source.write_bytes(b'\xe9t\xe9\n')
+    output = tmp_path / 'audit.jsonl'
+    audit_file(str(source), str(output), workers=1)
+
+    row = json.loads(output.read_text(encoding='utf-8'))
+    assert row['decided_by'] == 'common_password'
+
+@pytest.mark.parametrize('output_format', ['jsonl', 'csv'])
+def test_non_utf8_account_is_written_back_unchanged(tmp_path, output_format):
+    source = tmp_path / 'export.txt'
+    source.write_bytes(b'\xe9bob:hunter2\n')
+    output = tmp_path / 'audit.out'
+
+    summary = audit_file(str(source), str(output), separator=':', output_format=output_format)
+
+    assert summary['entries'] == 1
+    assert b'\xe9bob' in output.read_bytes()
+    if output_format == 'jsonl':
+        results = AuditResultFile(str(output))
+        assert results.scan()
+        assert results.row(0)['account'] == '\udce9bob'
+        results.close()
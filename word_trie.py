@@ -0,0 +1,206 @@
+import argparse, bisect, hashlib, mmap, os, struct, sys
+from collections import OrderedDict
+
+# Minimised byte-level trie (DAWG) stored as a flat file and read through mmap.
+# Nodes are written children-first: terminal flag, edge count, edge labels,
+# then one little-endian uint32 file offset per edge.
+TRIE_MAGIC = b'PGWT'
+TRIE_FORMAT = 1
+HEADER = struct.Struct('<4sBIII32s')
+NODE = struct.Struct('<BH')
+OFFSET = struct.Struct('<I')
+
+MIN_WORD_LENGTH = 3
+
+class WordTrie:
+    def __init__(self, path=None, buffer=None):
+        # Reads from an mmap of path, or from any byte buffer (e.g. shared memory)
+        self.path = path
+        self._mmap = None
+        if buffer is None:
+            with open(path, 'rb') as f:
+                self._mmap = buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # A memoryview so that indexing and bisect both see integers
+        self._map = memoryview(buffer)
+        magic, version, self.word_count, self.node_count, self.root, self.checksum = HEADER.unpack_from(self._map, 0)
+        if magic != TRIE_MAGIC or version != TRIE_FORMAT:
+            self.close()
+            raise ValueError(f"{path or 'buffer'} is not a word trie")
+
+    def close(self):
+        self._map.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def size(self):
+        return len(self._map)
+
+    def __contains__(self, word):
+        node = self.root
+        for byte in word.encode('utf-8', 'surrogateescape'):
+            node = self._child(node, byte)
+            if node is None:
+                return False
+        return self._map[node] == 1
+
+    def _child(self, node, byte):
+        terminal, count = NODE.unpack_from(self._map, node)
+        labels = node + NODE.size
+        index = bisect.bisect_left(self._map, byte, labels, labels + count)
+        if index == labels + count or self._map[index] != byte:
+            return None
+        return OFFSET.unpack_from(self._map, labels + count + (index - labels) * OFFSET.size)[0]
+
+    def prefix_ends(self, data, start):
+        # Byte offsets end such that data[start:end] is a word, found in a single walk
+        mm = self._map
+        node = self.root
+        for i in range(start, len(data)):
+            terminal, count = NODE.unpack_from(mm, node)
+            labels = node + NODE.size
+            end = labels + count
+            # Edge labels are stored sorted
+            index = bisect.bisect_left(mm, data[i], labels, end)
+            if index == end or mm[index] != data[i]:
+                return
+            node = OFFSET.unpack_from(mm, labels + count + (index - labels) * OFFSET.size)[0]
+            if mm[node] == 1:
+                yield i + 1
+
+    def find_all(self, text, min_length=MIN_WORD_LENGTH):
+        # Every (start, end) character span of text that is a dictionary word
+        data = text.encode('utf-8', 'surrogateescape')
+        if len(data) == len(text):
+            char_at = None
+        else:
+            char_at = {}
+            position = 0
+            for index, ch in enumerate(text):
+                char_at[position] = index
+                position += len(ch.encode('utf-8', 'surrogateescape'))
+            char_at[position] = len(text)
+
+        matches = []
+        for byte_start in range(len(data)):
+            if char_at is None:
+                start = byte_start
+            elif byte_start in char_at:
+                start = char_at[byte_start]
+            else:
+                continue
+            for byte_end in self.prefix_ends(data, byte_start):
+                end = byte_end if char_at is None else char_at[byte_end]
+                if end - start >= min_length:
+                    matches.append((start, end))
+        return matches
+
+    def cover(self, text, min_length=MIN_WORD_LENGTH):
+        # Non-overlapping matches, taking the longest word at each position
+        longest = {}
+        for start, end in self.find_all(text, min_length):
+            if end > longest.get(start, start):
+                longest[start] = end
+
+        spans = []
+        position = 0
+        while position < len(text):
+            end = longest.get(position)
+            if end is None:
+                position += 1
+            else:
+                spans.append((position, end))
+                position = end
+        return spans
+
+# -------- BUILDING --------
+# Default number of distinct nodes remembered for merging equal subtrees
+DEFAULT_REGISTER_LIMIT = 1 << 20
+
+def build_trie(sorted_words, path, register_limit=DEFAULT_REGISTER_LIMIT):
+    # sorted_words: unique byte strings in ascending order, e.g. from the wordlist compiler.
+    # Incremental construction: only the path of the current word is kept in
+    # memory. A node is written as soon as no later word can reach it, and
+    # equal subtrees are merged through a register of recently written nodes
+    # keyed by their record. Capping the register bounds memory; past the cap
+    # some equal subtrees are written twice, which costs size but not correctness.
+    tmp_path = path + '.tmp'
+    checksum = hashlib.sha256()
+    register = OrderedDict()
+    node_count = 0
+    offset = HEADER.size
+    word_count = 0
+
+    with open(tmp_path, 'wb') as out:
+        out.write(b'\0' * HEADER.size)
+
+        def write(node):
+            nonlocal node_count, offset
+            terminal, edges = node
+            record = (NODE.pack(terminal, len(edges)) + bytes(label for label, _ in edges) +
+                      b''.join(OFFSET.pack(child) for _, child in edges))
+            existing = register.get(record)
+            if existing is not None:
+                register.move_to_end(record)
+                return existing
+            out.write(record)
+            checksum.update(record)
+            register[record] = written = offset
+            if len(register) > register_limit:
+                register.popitem(last=False)
+            offset += len(record)
+            node_count += 1
+            return written
+
+        # branch[i] is [terminal, [(label, child offset), ...]] for the first i bytes of the previous word
+        branch = [[False, []]]
+        previous = b''
+        for word in sorted_words:
+            if word_count and word <= previous:
+                raise ValueError("words must be unique and sorted")
+            common = 0
+            limit = min(len(word), len(previous))
+            while common < limit and word[common] == previous[common]:
+                common += 1
+
+            # Edges are added in label order, since the words are sorted
+            while len(branch) > common + 1:
+                child = write(branch.pop())
+                branch[-1][1].append((previous[len(branch) - 1], child))
+            for _ in word[common:]:
+                branch.append([False, []])
+            branch[-1][0] = True
+            previous = word
+            word_count += 1
+
+        while len(branch) > 1:
+            child = write(branch.pop())
+            branch[-1][1].append((previous[len(branch) - 1], child))
+        root = write(branch.pop())
+
+        out.seek(0)
+        out.write(HEADER.pack(TRIE_MAGIC, TRIE_FORMAT, word_count, node_count, root, checksum.digest()))
+    os.replace(tmp_path, path)
+    return word_count
+
+def build_trie_from_files(paths, path, memory_limit=None, workers=None):
+    # Through the wordlist compiler's external sort, so entries are normalised
+    # the way the scorer looks them up and memory stays within memory_limit
+    from wordlist_compiler import DEFAULT_MEMORY, sorted_entries, trie_register_limit
+    memory_limit = memory_limit or DEFAULT_MEMORY
+    return build_trie(sorted_entries(paths, memory_limit, workers), path, trie_register_limit(memory_limit))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile wordlists into a word trie for substring detection.")
+    parser.add_argument('wordlists', nargs='+', help="files with one word per line (.gz accepted)")
+    parser.add_argument('-o', '--output', required=True, help="trie file to write")
+    parser.add_argument('--memory', type=int,
+                        help="memory budget for sorting and building in MiB (default: as wordlist_compiler.py)")
+    parser.add_argument('--workers', type=int, help="sorting processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    memory_limit = args.memory * 1024 * 1024 if args.memory else None
+    count = build_trie_from_files(args.wordlists, args.output, memory_limit, args.workers)
+    print(f"Wrote {count} words to {args.output} ({os.path.getsize(args.output)} bytes)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import hashlib, math, mmap, os, shutil, struct
+
+# Binary dictionary formats produced by wordlist_compiler.py. Words are
+# normalised UTF-8 in byte order; each file starts with a versioned header
+# holding a SHA-256 of everything after it.
+ARRAY_MAGIC = b'PGWA'
+BLOOM_MAGIC = b'PGBF'
+ARTIFACT_FORMAT = 1
+
+# magic, format, word count, data size, checksum; then (count + 1) uint64 offsets, then the words
+ARRAY_HEADER = struct.Struct('<4sBQQ32s')
+# magic, format, bit count, hash count, word count, checksum; then the bit array
+BLOOM_HEADER = struct.Struct('<4sBQBQ32s')
+OFFSET = struct.Struct('<Q')
+OFFSET_PAIR = struct.Struct('<QQ')
+BLOOM_HASH = struct.Struct('<QQ')
+
+def _open_map(path):
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _encode(word):
+    return word.encode('utf-8', 'surrogateescape') if isinstance(word, str) else word
+
+class SortedWordArray:
+    def __init__(self, path):
+        self.path = path
+        self._map = _open_map(path)
+        magic, version, self.count, data_size, self.checksum = ARRAY_HEADER.unpack_from(self._map, 0)
+        if magic != ARRAY_MAGIC or version != ARTIFACT_FORMAT:
+            self._map.close()
+            raise ValueError(f"{path} is not a sorted word array")
+        self._offsets = ARRAY_HEADER.size
+        self._data = self._offsets + (self.count + 1) * OFFSET.size
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self):
+        return self.count
+
+    def word(self, index):
+        start, end = OFFSET_PAIR.unpack_from(self._map, self._offsets + index * OFFSET.size)
+        return self._map[self._data + start:self._data + end]
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.word(index)
+
+    def __contains__(self, word):
+        key = _encode(word)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self.word(mid)
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+class SortedArrayWriter:
+    # Streams words to disk; offsets and data are spooled separately and joined on finish
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._size = 0
+        self._previous = None
+        self._offsets = open(path + '.offsets.tmp', 'wb')
+        self._words = open(path + '.data.tmp', 'wb')
+        self._offsets.write(OFFSET.pack(0))
+
+    def add(self, word):
+        if self._previous is not None and word <= self._previous:
+            raise ValueError("words must be unique and sorted")
+        self._words.write(word)
+        self._size += len(word)
+        self._offsets.write(OFFSET.pack(self._size))
+        self._previous = word
+        self.count += 1
+
+    def finish(self):
+        self._offsets.close()
+        self._words.close()
+        checksum = hashlib.sha256()
+        for part in (self._offsets.name, self._words.name):
+            with open(part, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    checksum.update(block)
+
+        with open(self.path + '.tmp', 'wb') as out:
+            out.write(ARRAY_HEADER.pack(ARRAY_MAGIC, ARTIFACT_FORMAT, self.count, self._size, checksum.digest()))
+            for part in (self._offsets.name, self._words.name):
+                with open(part, 'rb') as f:
+                    shutil.copyfileobj(f, out, 1 << 20)
+                os.remove(part)
+        os.replace(self.path + '.tmp', self.path)
+        return self.count
+
+def _bloom_positions(word, bits, hashes):
+    h1, h2 = BLOOM_HASH.unpack(hashlib.blake2b(word, digest_size=16).digest())
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+class BloomFilter:
+    def __init__(self, path):
+        self.path = path
+        self._map = _open_map(path)
+        magic, version, self.bits, self.hashes, self.count, self.checksum = BLOOM_HEADER.unpack_from(self._map, 0)
+        if magic != BLOOM_MAGIC or version != ARTIFACT_FORMAT:
+            self._map.close()
+            raise ValueError(f"{path} is not a bloom filter")
+
+    def close(self):
+        self._map.close()
+
+    def __contains__(self, word):
+        base = BLOOM_HEADER.size
+        for position in _bloom_positions(_encode(word), self.bits, self.hashes):
+            if not self._map[base + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+def build_bloom(words, count, path, false_positive_rate=0.001):
+    # The bit array is written through an mmap, so memory stays flat however large it is
+    bits = max(8, math.ceil(-max(count, 1) * math.log(false_positive_rate) / math.log(2) ** 2))
+    hashes = max(1, round(bits / max(count, 1) * math.log(2)))
+    size = BLOOM_HEADER.size + (bits + 7) // 8
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.truncate(size)
+    with open(tmp_path, 'r+b') as f:
+        bitmap = mmap.mmap(f.fileno(), size)
+        base = BLOOM_HEADER.size
+        for word in words:
+            for position in _bloom_positions(word, bits, hashes):
+                bitmap[base + (position >> 3)] |= 1 << (position & 7)
+        checksum = hashlib.sha256(memoryview(bitmap)[base:]).digest()
+        bitmap[:base] = BLOOM_HEADER.pack(BLOOM_MAGIC, ARTIFACT_FORMAT, bits, hashes, count, checksum)
+        bitmap.flush()
+        bitmap.close()
+    os.replace(tmp_path, path)
+
+class CompiledWordList:
+    # Exact membership from the sorted array, with the bloom filter (if any)
+    # answering most misses without touching the array
+    def __init__(self, path, bloom_path=None):
+        self.words = SortedWordArray(path)
+        self.bloom = BloomFilter(bloom_path) if bloom_path else None
+        self.checksum = self.words.checksum
+
+    def __contains__(self, word):
+        key = _encode(word)
+        if self.bloom is not None and key not in self.bloom:
+            return False
+        return key in self.words
+
+    def __len__(self):
+        return len(self.words)
+
+    @property
+    def path(self):
+        return self.words.path
+
+    @property
+    def bloom_path(self):
+        return self.bloom.path if self.bloom is not None else None
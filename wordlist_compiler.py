@@ -0,0 +1,160 @@
+import argparse, gzip, heapq, multiprocessing, os, shutil, sys, tempfile, time
+
+from wordlist_artifacts import SortedArrayWriter, SortedWordArray, build_bloom
+from word_trie import build_trie
+
+# Offline build for the dictionaries the scorer loads. Raw wordlists may be
+# larger than memory, so this is an external merge sort:
+#   1. the input is cut into chunks that worker processes normalise, sort,
+#      deduplicate and write out as run files;
+#   2. runs are merged (in parallel rounds while there are too many to open
+#      at once) into one sorted, duplicate-free stream;
+#   3. that stream is written as a sorted array, then a bloom filter and a
+#      word trie are built from it, both streaming to disk.
+
+DEFAULT_MEMORY = 256 * 1024 * 1024
+DEFAULT_FAN_IN = 64
+# Rough size of one trie register entry (record, offset, LRU links)
+TRIE_REGISTER_ENTRY = 256
+
+def normalize_entry(raw):
+    # Same decoding and normalisation as the scorer applies to audited input
+    # (UTF-8 with surrogateescape, then password.lower()), so bytes that are
+    # not valid UTF-8 are kept as they are and still match on lookup.
+    raw = raw.rstrip(b'\r\n')
+    if not raw:
+        return None
+    return raw.decode('utf-8', 'surrogateescape').lower().encode('utf-8', 'surrogateescape')
+
+def read_raw_lines(paths):
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as f:
+            yield from f
+
+def sort_run(lines, path):
+    words = {normalize_entry(line) for line in lines}
+    words.discard(None)
+    with open(path, 'wb') as out:
+        for word in sorted(words):
+            out.write(word + b'\n')
+    return path
+
+def _read_run(path):
+    with open(path, 'rb') as f:
+        for line in f:
+            yield line[:-1]
+
+def merge_sorted(iterables):
+    previous = None
+    for word in heapq.merge(*iterables):
+        if word != previous:
+            yield word
+            previous = word
+
+def merge_runs_to_file(paths, path):
+    with open(path, 'wb') as out:
+        for word in merge_sorted([_read_run(run) for run in paths]):
+            out.write(word + b'\n')
+    for run in paths:
+        os.remove(run)
+    return path
+
+def make_runs(paths, work_dir, pool, workers, memory_limit):
+    # Up to workers chunks are being sorted while the next one fills, so each
+    # chunk gets an equal share of the memory budget
+    chunk_bytes = max(1 << 20, memory_limit // (2 * (workers + 1)))
+    pending = []
+    runs = []
+    chunk = []
+    size = 0
+
+    def submit():
+        run_path = os.path.join(work_dir, f"run-{len(runs) + len(pending):06d}")
+        pending.append(pool.apply_async(sort_run, (chunk, run_path)))
+        while len(pending) > workers:
+            runs.append(pending.pop(0).get())
+
+    for line in read_raw_lines(paths):
+        chunk.append(line)
+        size += len(line) + 64
+        if size >= chunk_bytes:
+            submit()
+            chunk, size = [], 0
+    if chunk:
+        submit()
+    runs.extend(job.get() for job in pending)
+    return runs
+
+def reduce_runs(runs, work_dir, pool, fan_in):
+    generation = 0
+    while len(runs) > fan_in:
+        groups = [runs[i:i + fan_in] for i in range(0, len(runs), fan_in)]
+        jobs = [pool.apply_async(merge_runs_to_file, (group, os.path.join(work_dir, f"merge-{generation}-{index:06d}")))
+                for index, group in enumerate(groups)]
+        runs = [job.get() for job in jobs]
+        generation += 1
+    return runs
+
+def sorted_entries(paths, memory_limit=DEFAULT_MEMORY, workers=None, fan_in=DEFAULT_FAN_IN, work_dir=None):
+    # Normalised, unique entries of the wordlists in byte order (steps 1 and 2)
+    workers = workers or os.cpu_count() or 1
+    work_dir = tempfile.mkdtemp(prefix='wordlist-', dir=work_dir)
+    try:
+        with multiprocessing.Pool(workers) as pool:
+            runs = make_runs(paths, work_dir, pool, workers, memory_limit)
+            runs = reduce_runs(runs, work_dir, pool, fan_in)
+        yield from merge_sorted([_read_run(run) for run in runs])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def trie_register_limit(memory_limit):
+    return max(1024, memory_limit // TRIE_REGISTER_ENTRY)
+
+def compile_wordlists(paths, output_prefix, memory_limit=DEFAULT_MEMORY, workers=None, fan_in=DEFAULT_FAN_IN,
+                      bloom=True, trie=True, false_positive_rate=0.001, work_dir=None):
+    outputs = {}
+    writer = SortedArrayWriter(output_prefix + '.words')
+    for word in sorted_entries(paths, memory_limit, workers, fan_in, work_dir):
+        writer.add(word)
+    count = writer.finish()
+    outputs['words'] = writer.path
+
+    words = SortedWordArray(outputs['words'])
+    try:
+        if bloom:
+            outputs['bloom'] = output_prefix + '.bloom'
+            build_bloom(iter(words), count, outputs['bloom'], false_positive_rate)
+        if trie:
+            outputs['trie'] = output_prefix + '.dawg'
+            build_trie(iter(words), outputs['trie'], trie_register_limit(memory_limit))
+    finally:
+        words.close()
+    return count, outputs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile raw wordlists into the dictionary files the scorer loads.")
+    parser.add_argument('wordlists', nargs='+', help="raw wordlists, one entry per line (.gz accepted)")
+    parser.add_argument('-o', '--output', required=True,
+                        help="output prefix; writes PREFIX.words, PREFIX.bloom and PREFIX.dawg")
+    parser.add_argument('--memory', type=int, default=DEFAULT_MEMORY // (1024 * 1024),
+                        help="memory budget for sorting and for the trie's node register in MiB")
+    parser.add_argument('--workers', type=int, help="sorting processes (default: CPU count)")
+    parser.add_argument('--fan-in', type=int, default=DEFAULT_FAN_IN, help="runs merged at once")
+    parser.add_argument('--fp-rate', type=float, default=0.001, help="bloom filter false-positive rate")
+    parser.add_argument('--no-bloom', action='store_true', help="skip the bloom filter")
+    parser.add_argument('--no-trie', action='store_true', help="skip the word trie")
+    parser.add_argument('--tmp-dir', help="where to keep sorted runs (default: system temp)")
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    count, outputs = compile_wordlists(
+        args.wordlists, args.output, args.memory * 1024 * 1024, args.workers, args.fan_in,
+        bloom=not args.no_bloom, trie=not args.no_trie, false_positive_rate=args.fp_rate, work_dir=args.tmp_dir
+    )
+    print(f"Compiled {count} unique entries in {time.time() - started:.1f}s", file=sys.stderr)
+    for kind, path in outputs.items():
+        print(f"  {kind}: {path} ({os.path.getsize(path)} bytes)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()